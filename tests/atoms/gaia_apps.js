@@ -307,6 +307,49 @@ var GaiaApps = {
     GaiaApps.locateWithManifestURL(manifestURL, entryPoint, this.launch);
   },
 
+  // Launches the app like launch, and returns when the launch started, when
+  // the app was opened and, if it was not already running, when it loaded,
+  // in milliseconds since the epoch.
+  measureLaunch: function(app, appName, launchPath, entryPoint) {
+    if (!app) {
+      marionetteScriptFinished(false);
+      return;
+    }
+    let origin = app.origin;
+    let result = {cold: !GaiaApps.isRunning(origin)};
+
+    let finish = function() {
+      if (result.opened && (result.loaded || !result.cold)) {
+        window.removeEventListener('appopen', onOpen);
+        window.removeEventListener('apploadtime', onLoad);
+        marionetteScriptFinished(result);
+      }
+    };
+    let onOpen = function(evt) {
+      if (evt.detail.origin == origin) {
+        result.opened = Date.now();
+        finish();
+      }
+    };
+    let onLoad = function(evt) {
+      if (evt.detail.src.indexOf(origin) == 0) {
+        result.loaded = Date.now();
+        finish();
+      }
+    };
+    window.addEventListener('appopen', onOpen);
+    window.addEventListener('apploadtime', onLoad);
+
+    console.log("measuring launch of app with name '" + appName + "'");
+    result.start = Date.now();
+    app.launch(entryPoint || null);
+  },
+
+  // Measures the launch of the app with the specified name, see measureLaunch.
+  measureLaunchWithName: function(name) {
+    GaiaApps.locateWithName(name, GaiaApps.measureLaunch);
+  },
+
   close: function(app, appName, entryPoint) {
     if (app) {
       let origin = GaiaApps.getRunningAppOrigin(appName);
@@ -94,6 +94,36 @@ var GaiaDataLayer = {
     };
   },
 
+  insertContacts: function(aContacts) {
+    SpecialPowers.addPermission('contacts-create', true, document);
+    var contactsLength = aContacts.length;
+    var saved = 0;
+    var done = 0;
+    var finished = function() {
+      if (++done === contactsLength) {
+        console.log('saved ' + saved + ' of ' + contactsLength + ' contacts');
+        SpecialPowers.removePermission('contacts-create', document);
+        marionetteScriptFinished(saved);
+      }
+    };
+    if (contactsLength === 0) {
+      SpecialPowers.removePermission('contacts-create', document);
+      marionetteScriptFinished(0);
+      return;
+    }
+    for (var i = 0; i < contactsLength; i++) {
+      var req = window.navigator.mozContacts.save(new mozContact(aContacts[i]));
+      req.onsuccess = function() {
+        saved++;
+        finished();
+      };
+      req.onerror = function(aEvent) {
+        console.error('error saving contact', aEvent.target.error.name);
+        finished();
+      };
+    }
+  },
+
   getAllContacts: function(aCallback) {
     var callback = aCallback || marionetteScriptFinished;
     SpecialPowers.addPermission('contacts-read', true, document);
@@ -110,6 +140,21 @@ var GaiaDataLayer = {
     };
   },
 
+  getContactCount: function(aCallback) {
+    var callback = aCallback || marionetteScriptFinished;
+    SpecialPowers.addPermission('contacts-read', true, document);
+    var req = window.navigator.mozContacts.getCount();
+    req.onsuccess = function() {
+      SpecialPowers.removePermission('contacts-read', document);
+      callback(req.result);
+    };
+    req.onerror = function() {
+      console.error('error counting contacts ' + req.error.name);
+      SpecialPowers.removePermission('contacts-read', document);
+      callback(null);
+    };
+  },
+
   getSIMContacts: function(aType, aCallback) {
     var type = aType || 'adn';
     var callback = aCallback || marionetteScriptFinished;
@@ -135,24 +180,18 @@ var GaiaDataLayer = {
   },
 
   removeAllContacts: function() {
-    var self = this;
-    this.getAllContacts(function(aContacts) {
-      if (aContacts.length > 0) {
-        var contactsLength = aContacts.length;
-        var done = 0;
-        for (var i = 0; i < contactsLength; i++) {
-          self.removeContact(aContacts[i], function() {
-            if (++done === contactsLength) {
-              marionetteScriptFinished(true);
-            }
-          });
-        }
-      }
-      else {
-        console.log('no contacts to remove');
-          marionetteScriptFinished(true);
-      }
-    });
+    SpecialPowers.addPermission('contacts-write', true, document);
+    var req = window.navigator.mozContacts.clear();
+    req.onsuccess = function() {
+      console.log('success removing all contacts');
+      SpecialPowers.removePermission('contacts-write', document);
+      marionetteScriptFinished(true);
+    };
+    req.onerror = function() {
+      console.error('error removing all contacts ' + req.error.name);
+      SpecialPowers.removePermission('contacts-write', document);
+      marionetteScriptFinished(false);
+    };
   },
 
   removeContact: function(aContact, aCallback) {
@@ -205,6 +244,58 @@ var GaiaDataLayer = {
     };
   },
 
+  setSettings: function(aSettings, aCallback) {
+    var callback = aCallback || marionetteScriptFinished;
+    SpecialPowers.addPermission('settings-readwrite', true, document);
+    var names = Object.keys(aSettings);
+    var failures = {};
+    var done = 0;
+
+    if (names.length === 0) {
+      console.log('no settings to change');
+      callback(failures);
+      return;
+    }
+
+    // All requests share a single lock so they run in one transaction
+    var lock = window.navigator.mozSettings.createLock();
+    names.forEach(function(aName) {
+      var setting = {};
+      setting[aName] = aSettings[aName];
+      console.log('setting ' + aName + ' to ' + aSettings[aName]);
+      var req = lock.set(setting);
+      req.onsuccess = function() {
+        if (++done === names.length) {
+          callback(failures);
+        }
+      };
+      req.onerror = function() {
+        console.log('error changing setting ' + aName + ' ' + req.error.name);
+        failures[aName] = req.error.name;
+        if (++done === names.length) {
+          callback(failures);
+        }
+      };
+    });
+  },
+
+  setPrefs: function(aPrefs) {
+    var failures = {};
+    for (var name in aPrefs) {
+      var datatype = aPrefs[name][0];
+      var value = aPrefs[name][1];
+      console.log('setting pref ' + name + ' to ' + value);
+      try {
+        SpecialPowers['set' + datatype + 'Pref'](name, value);
+      }
+      catch (e) {
+        console.log('error changing pref ' + name + ' ' + e);
+        failures[name] = e.toString();
+      }
+    }
+    return failures;
+  },
+
   connectToWiFi: function(aNetwork, aCallback) {
     var callback = aCallback || marionetteScriptFinished;
     var manager = window.navigator.mozWifiManager;
@@ -0,0 +1,142 @@
+/* This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this file,
+ * You can obtain one at http://mozilla.org/MPL/2.0/. */
+
+'use strict';
+
+var GaiaQuery = {
+
+  findElements: function(by, locator) {
+    let doc = window.document;
+    let slice = Array.prototype.slice;
+    switch (by) {
+      case 'id':
+        let element = doc.getElementById(locator);
+        return element ? [element] : [];
+      case 'name':
+        return slice.call(doc.getElementsByName(locator));
+      case 'class name':
+        return slice.call(doc.getElementsByClassName(locator));
+      case 'tag name':
+        return slice.call(doc.getElementsByTagName(locator));
+      case 'css selector':
+        return slice.call(doc.querySelectorAll(locator));
+      case 'xpath':
+        let result = doc.evaluate(locator, doc, null,
+          XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        let elements = [];
+        for (let i = 0; i < result.snapshotLength; i++) {
+          elements.push(result.snapshotItem(i));
+        }
+        return elements;
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+  },
+
+  count: function(by, locator) {
+    return GaiaQuery.findElements(by, locator).length;
+  },
+
+  // Rendered text, like Marionette's getElementText: the text of descendants
+  // that are not displayed is left out, and whitespace is collapsed.
+  text: function(element) {
+    let win = element.ownerDocument.defaultView;
+    let parts = [];
+    let walk = function(node) {
+      for (let child = node.firstChild; child; child = child.nextSibling) {
+        if (child.nodeType == 3) {
+          if (win.getComputedStyle(node).visibility == 'visible') {
+            parts.push(child.data);
+          }
+        } else if (child.nodeType == 1) {
+          let style = win.getComputedStyle(child);
+          if (style.display == 'none') {
+            continue;
+          }
+          if (child.localName == 'br') {
+            parts.push(' ');
+            continue;
+          }
+          // inline elements join their neighbours, as in rendered text
+          let block = style.display.indexOf('inline') != 0;
+          if (block) {
+            parts.push(' ');
+          }
+          walk(child);
+          if (block) {
+            parts.push(' ');
+          }
+        }
+      }
+    };
+    if (win.getComputedStyle(element).display == 'none') {
+      return '';
+    }
+    walk(element);
+    return parts.join('').replace(/\s+/g, ' ').trim();
+  },
+
+  // Loose check that the element is displayed: it has a size, and neither it
+  // nor its ancestors are hidden.
+  isDisplayed: function(element) {
+    let win = element.ownerDocument.defaultView;
+    if (win.getComputedStyle(element).visibility != 'visible') {
+      return false;
+    }
+    let rect = element.getBoundingClientRect();
+    if (rect.width == 0 || rect.height == 0) {
+      return false;
+    }
+    for (let el = element; el && el.nodeType == 1; el = el.parentNode) {
+      if (win.getComputedStyle(el).display == 'none') {
+        return false;
+      }
+    }
+    return true;
+  },
+
+  // Reads one field of an element. A field is 'text', 'displayed', 'rect' or
+  // '@' followed by an attribute name, optionally read from the first
+  // descendant matching a CSS selector, in which case it is null if there is
+  // no such descendant.
+  read: function(element, field, selector) {
+    if (selector) {
+      element = element.querySelector(selector);
+      if (!element) {
+        return null;
+      }
+    }
+    if (field.charAt(0) == '@') {
+      return element.getAttribute(field.substr(1));
+    }
+    switch (field) {
+      case 'text':
+        return GaiaQuery.text(element);
+      case 'displayed':
+        return GaiaQuery.isDisplayed(element);
+      case 'rect':
+        let rect = element.getBoundingClientRect();
+        return {
+          x: rect.left,
+          y: rect.top,
+          width: rect.width,
+          height: rect.height
+        };
+    }
+    throw new Error('Unsupported field: ' + field);
+  },
+
+  // Returns a [element, values] pair for every matching element, where values
+  // maps each name in fields to what was read for it. Each field is given as
+  // [field, selector], see read.
+  queryAll: function(by, locator, fields) {
+    return GaiaQuery.findElements(by, locator).map(function(element) {
+      let values = {};
+      for (let name in fields) {
+        values[name] = GaiaQuery.read(element, fields[name][0],
+                                      fields[name][1]);
+      }
+      return [element, values];
+    });
+  }
+};
@@ -0,0 +1,306 @@
+/* This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this file,
+ * You can obtain one at http://mozilla.org/MPL/2.0/. */
+
+'use strict';
+
+var GaiaWait = {
+
+  // how often to check conditions that can change without a DOM mutation,
+  // such as layout, in milliseconds
+  _checkInterval: 500,
+
+  // how long nothing must have changed for before an element is considered
+  // settled, in milliseconds
+  _settleTime: 100,
+
+  findElement: function(by, locator) {
+    let doc = window.document;
+    switch (by) {
+      case 'id':
+        return doc.getElementById(locator);
+      case 'name':
+        return doc.getElementsByName(locator)[0] || null;
+      case 'class name':
+        return doc.getElementsByClassName(locator)[0] || null;
+      case 'tag name':
+        return doc.getElementsByTagName(locator)[0] || null;
+      case 'css selector':
+        return doc.querySelector(locator);
+      case 'xpath':
+        return doc.evaluate(locator, doc, null,
+          XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+  },
+
+  isPresent: function(by, locator) {
+    return GaiaWait.findElement(by, locator) !== null;
+  },
+
+  // Loose check that the element may be displayed: it and its ancestors are
+  // not display: none, and it is not visibility: hidden.
+  mayBeDisplayed: function(element) {
+    let win = element.ownerDocument.defaultView;
+    if (win.getComputedStyle(element).visibility != 'visible') {
+      return false;
+    }
+    for (let el = element; el && el.nodeType == 1; el = el.parentNode) {
+      if (win.getComputedStyle(el).display == 'none') {
+        return false;
+      }
+    }
+    return true;
+  },
+
+  // Loose check that the element may not be displayed: as above, or it has no
+  // size, or it or one of its ancestors is fully transparent.
+  mayBeHidden: function(element) {
+    if (!GaiaWait.mayBeDisplayed(element)) {
+      return true;
+    }
+    let rect = element.getBoundingClientRect();
+    if (rect.width == 0 || rect.height == 0) {
+      return true;
+    }
+    let win = element.ownerDocument.defaultView;
+    for (let el = element; el && el.nodeType == 1; el = el.parentNode) {
+      if (win.getComputedStyle(el).opacity == '0') {
+        return true;
+      }
+    }
+    return false;
+  },
+
+  check: function(by, locator, state) {
+    let element = GaiaWait.findElement(by, locator);
+    switch (state) {
+      case 'present':
+        return element !== null;
+      case 'not present':
+        return element === null;
+      case 'displayed':
+        return element !== null && GaiaWait.mayBeDisplayed(element);
+      case 'not displayed':
+        return element === null || GaiaWait.mayBeHidden(element);
+    }
+    throw new Error('Unsupported state: ' + state);
+  },
+
+  // Finishes with true once the element is in the given state, or false after
+  // the timeout. The condition is checked whenever the DOM changes, or a
+  // transition or animation ends, and every _checkInterval for anything else.
+  waitFor: function(by, locator, state, timeout) {
+    if (GaiaWait.check(by, locator, state)) {
+      marionetteScriptFinished(true);
+      return;
+    }
+
+    let doc = window.document;
+    let observer, intervalId, timeoutId;
+    let finish = function(result) {
+      observer.disconnect();
+      doc.removeEventListener('transitionend', check, true);
+      doc.removeEventListener('animationend', check, true);
+      clearInterval(intervalId);
+      clearTimeout(timeoutId);
+      marionetteScriptFinished(result);
+    };
+    let check = function() {
+      if (GaiaWait.check(by, locator, state)) {
+        finish(true);
+      }
+    };
+
+    observer = new window.MutationObserver(check);
+    observer.observe(doc, {
+      attributes: true,
+      childList: true,
+      subtree: true
+    });
+    doc.addEventListener('transitionend', check, true);
+    doc.addEventListener('animationend', check, true);
+    intervalId = setInterval(check, GaiaWait._checkInterval);
+    timeoutId = setTimeout(function() { finish(false); }, timeout);
+  },
+
+  // Returns the longest transition declared on the element, including its
+  // delay, in milliseconds.
+  transitionTime: function(element) {
+    let style = element.ownerDocument.defaultView.getComputedStyle(element);
+    let toMilliseconds = function(value) {
+      return parseFloat(value) * (/ms$/.test(value) ? 1 : 1000) || 0;
+    };
+    let durations = style.transitionDuration.split(',').map(toMilliseconds);
+    let delays = style.transitionDelay.split(',').map(toMilliseconds);
+    let longest = 0;
+    durations.forEach(function(duration, i) {
+      longest = Math.max(longest, duration + delays[i % delays.length]);
+    });
+    return longest;
+  },
+
+  // Returns the longest transition declared on the element or its
+  // descendants, which is how long one started by a change to them can run.
+  subtreeTransitionTime: function(element) {
+    if (element.nodeType != 1) {
+      element = element.documentElement || element.parentElement;
+    }
+    if (!element) {
+      return 0;
+    }
+    let longest = GaiaWait.transitionTime(element);
+    let descendants = element.querySelectorAll('*');
+    for (let i = 0; i < descendants.length; i++) {
+      longest = Math.max(longest, GaiaWait.transitionTime(descendants[i]));
+    }
+    return longest;
+  },
+
+  // Returns whether a CSS transition is running in the element or its
+  // descendants, or false where the platform cannot tell.
+  isTransitionRunning: function(root) {
+    let animations;
+    if (root.nodeType == 9 && root.getAnimations) {
+      animations = root.getAnimations();
+    } else if (root.nodeType == 1 && root.getAnimations) {
+      animations = root.getAnimations({subtree: true});
+    } else {
+      return false;
+    }
+    // animations, such as spinners, can run forever, so only count transitions
+    return animations.some(function(animation) {
+      return animation.playState == 'running' &&
+             typeof animation.transitionProperty == 'string';
+    });
+  },
+
+  // Finishes with true once no transition is running on the element or its
+  // descendants and nothing has changed in them for _settleTime, or with false
+  // after the timeout. Without a locator the whole document is watched.
+  //
+  // Transitions are tracked from their transitionrun or transitionstart
+  // events until they end or are cancelled. As these are not fired on every
+  // platform, and a transition may have started before the wait, each change
+  // also waits for the longest transition declared where it happened.
+  waitForTransition: function(by, locator, timeout) {
+    let doc = window.document;
+    let root = by ? GaiaWait.findElement(by, locator) : doc;
+    if (!root) {
+      marionetteScriptFinished(false);
+      return;
+    }
+
+    let observer, settleId, timeoutId;
+    // {element: [transitioning properties]}
+    let running = new Map();
+    let deadline = Date.now() + GaiaWait.subtreeTransitionTime(root);
+    let events = ['transitionrun', 'transitionstart', 'transitionend',
+                  'transitioncancel', 'animationend'];
+    let finish = function(result) {
+      observer.disconnect();
+      events.forEach(function(name) {
+        root.removeEventListener(name, onEvent, true);
+      });
+      clearTimeout(settleId);
+      clearTimeout(timeoutId);
+      marionetteScriptFinished(result);
+    };
+    let settle = function() {
+      clearTimeout(settleId);
+      settleId = setTimeout(function() {
+        if (Date.now() < deadline || running.size ||
+            GaiaWait.isTransitionRunning(root)) {
+          settle();
+        } else {
+          finish(true);
+        }
+      }, Math.max(GaiaWait._settleTime, deadline - Date.now()));
+    };
+    let onEvent = function(event) {
+      let properties = running.get(event.target) || [];
+      let index = properties.indexOf(event.propertyName);
+      if (event.type == 'transitionrun' || event.type == 'transitionstart') {
+        if (index == -1) {
+          properties.push(event.propertyName);
+          running.set(event.target, properties);
+        }
+      } else if (index != -1) {
+        properties.splice(index, 1);
+        if (!properties.length) {
+          running.delete(event.target);
+        }
+      }
+      settle();
+    };
+    let onMutation = function(records) {
+      records.forEach(function(record) {
+        let changed = record.type == 'childList' ?
+          Array.prototype.slice.call(record.addedNodes) : [record.target];
+        changed.forEach(function(node) {
+          if (node.nodeType == 1) {
+            deadline = Math.max(deadline,
+              Date.now() + GaiaWait.subtreeTransitionTime(node));
+          }
+        });
+      });
+      settle();
+    };
+
+    observer = new window.MutationObserver(onMutation);
+    observer.observe(root, {
+      attributes: true,
+      attributeFilter: ['class', 'style', 'hidden'],
+      childList: true,
+      subtree: true
+    });
+    events.forEach(function(name) {
+      root.addEventListener(name, onEvent, true);
+    });
+    settle();
+    timeoutId = setTimeout(function() { finish(false); }, timeout);
+  },
+
+  // Starts counting the named event on the window, such as appopened,
+  // visibilitychange or transitionend, so that an action can be followed by
+  // waiting for the event it fires. Must be run in the same sandbox as
+  // waitForEvent.
+  expectEvent: function(name) {
+    let events = window.gaiaWaitEvents = window.gaiaWaitEvents || {};
+    if (events[name]) {
+      events[name].count = 0;
+      return;
+    }
+    let record = events[name] = {count: 0, callback: null};
+    window.addEventListener(name, function() {
+      record.count++;
+      if (record.callback) {
+        record.callback();
+      }
+    }, true);
+  },
+
+  // Finishes with true once the named event has fired since expectEvent, or
+  // with false after the timeout.
+  waitForEvent: function(name, timeout) {
+    let record = (window.gaiaWaitEvents || {})[name];
+    if (!record) {
+      throw new Error('Not expecting event: ' + name);
+    }
+    if (record.count) {
+      record.count = 0;
+      marionetteScriptFinished(true);
+      return;
+    }
+
+    let timeoutId;
+    let finish = function(result) {
+      record.callback = null;
+      record.count = 0;
+      clearTimeout(timeoutId);
+      marionetteScriptFinished(result);
+    };
+    record.callback = function() { finish(true); };
+    timeoutId = setTimeout(function() { finish(false); }, timeout);
+  }
+};
@@ -2,15 +2,16 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
-
 from marionette.by import By
 from marionette.errors import NoSuchElementException
 from marionette.errors import StaleElementException
+from marionette.errors import TimeoutException
 from marionette.wait import Wait
 
 from gaiatest import GaiaApps
 from gaiatest import Accessibility
+from gaiatest import ElementQuery
+from gaiatest import ElementWait
 
 
 class Base(object):
@@ -24,11 +25,17 @@ class Base(object):
     def launch(self, launch_timeout=None):
         self.app = self.apps.launch(self.name, launch_timeout=launch_timeout)
 
+    @property
+    def element_wait(self):
+        return ElementWait(self.marionette)
+
     def wait_for_element_present(self, by, locator, timeout=None):
+        timeout = self.element_wait.until(by, locator, 'present', timeout)
         return Wait(self.marionette, timeout, ignored_exceptions=NoSuchElementException).until(
             lambda m: m.find_element(by, locator))
 
     def wait_for_element_not_present(self, by, locator, timeout=None):
+        timeout = self.element_wait.until(by, locator, 'not present', timeout)
         self.marionette.set_search_timeout(0)
         try:
             return Wait(self.marionette, timeout).until(
@@ -38,10 +45,12 @@ class Base(object):
         self.marionette.set_search_timeout(self.marionette.timeout or 10000)
 
     def wait_for_element_displayed(self, by, locator, timeout=None):
+        timeout = self.element_wait.until(by, locator, 'displayed', timeout)
         Wait(self.marionette, timeout, ignored_exceptions=[NoSuchElementException, StaleElementException]).until(
             lambda m: m.find_element(by, locator).is_displayed())
 
     def wait_for_element_not_displayed(self, by, locator, timeout=None):
+        timeout = self.element_wait.until(by, locator, 'not displayed', timeout)
         self.marionette.set_search_timeout(0)
         try:
             Wait(self.marionette, timeout, ignored_exceptions=StaleElementException).until(
@@ -53,7 +62,24 @@ class Base(object):
     def wait_for_condition(self, method, timeout=None, message=None):
         Wait(self.marionette, timeout).until(method, message=message)
 
+    def wait_for_transition(self, by=None, locator=None, timeout=None):
+        # waits for transitions in the element, or the whole frame, to
+        # settle, rather than sleeping for how long they might take
+        if self.element_wait.transition(by, locator, timeout) is False:
+            raise TimeoutException('Transitions did not settle in %s' % (
+                locator or 'the document'))
+
+    def expect_event(self, name):
+        self.element_wait.expect_event(name)
+
+    def wait_for_event(self, name, timeout=None):
+        if not self.element_wait.event(name, timeout):
+            raise TimeoutException('Event %s was not fired' % name)
+
     def is_element_present(self, by, locator):
+        present = self.element_wait.is_present(by, locator)
+        if present is not None:
+            return present
         self.marionette.set_search_timeout(0)
         try:
             self.marionette.find_element(by, locator)
@@ -63,6 +89,14 @@ class Base(object):
         finally:
             self.marionette.set_search_timeout(self.marionette.timeout or 10000)
 
+    def query_all(self, by, locator, fields=None):
+        # reads the fields of every matching element in one round trip,
+        # see ElementQuery for what can be read
+        return ElementQuery(self.marionette).query_all(by, locator, fields)
+
+    def count_elements(self, by, locator):
+        return ElementQuery(self.marionette).count(by, locator)
+
     def is_element_displayed(self, by, locator):
         self.marionette.set_search_timeout(0)
         try:
@@ -78,9 +112,7 @@ class Base(object):
             match_string)
         # have to go back to top level to get the B2G select box wrapper
         self.marionette.switch_to_frame()
-        # TODO we should find something suitable to wait for, but this goes too
-        # fast against desktop builds causing intermittent failures
-        time.sleep(0.2)
+        self.wait_for_transition()
 
         li = self.wait_for_element_present(*_list_item_locator)
 
@@ -92,10 +124,7 @@ class Base(object):
 
     def wait_for_select_closed(self, by, locator):
         self.wait_for_element_not_displayed(by, locator)
-
-        # TODO we should find something suitable to wait for, but this goes too
-        # fast against desktop builds causing intermittent failures
-        time.sleep(0.2)
+        self.wait_for_transition()
 
         # now back to app
         self.apps.switch_to_displayed_app()
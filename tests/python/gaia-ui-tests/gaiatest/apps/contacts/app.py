@@ -39,11 +39,11 @@ class Contacts(Base):
 
     @property
     def contacts(self):
-        return [self.Contact(marionette=self.marionette, element=contact)
-                for contact in self.marionette.find_elements(*self._contact_locator)]
+        return [self.Contact(marionette=self.marionette, element=contact.element, snapshot=contact)
+                for contact in self.query_all(*self._contact_locator, fields=self.Contact.fields)]
 
     def wait_for_contacts(self, number_to_wait_for=1):
-        self.wait_for_condition(lambda m: len(m.find_elements(*self._contact_locator)) == number_to_wait_for)
+        self.wait_for_condition(lambda m: self.count_elements(*self._contact_locator) == number_to_wait_for)
 
     def contact(self, name):
         for contact in self.contacts:
@@ -86,12 +86,24 @@ class Contacts(Base):
         _name_locator = (By.CSS_SELECTOR, 'p > strong')
         _full_name_locator = (By.CSS_SELECTOR, 'p')
 
+        # read for every contact at once by Contacts.contacts
+        fields = {'name': ('text', _name_locator[1]),
+                  'full_name': ('text', _full_name_locator[1])}
+
+        def __init__(self, marionette, element, snapshot=None):
+            PageRegion.__init__(self, marionette, element)
+            self.snapshot = snapshot
+
         @property
         def name(self):
+            if self.snapshot:
+                return self.snapshot.name
             return self.root_element.find_element(*self._name_locator).text
 
         @property
         def full_name(self):
+            if self.snapshot:
+                return self.snapshot.full_name
             return self.root_element.find_element(*self._full_name_locator).text
 
         def tap(self, return_class='ContactDetails'):
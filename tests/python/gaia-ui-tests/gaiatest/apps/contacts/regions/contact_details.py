@@ -32,7 +32,7 @@ class ContactDetails(Base):
 
     @property
     def phone_numbers(self):
-        return [element.text for element in self.marionette.find_elements(*self._phone_numbers_locator)]
+        return [element.text for element in self.query_all(*self._phone_numbers_locator, fields={'text': 'text'})]
 
     @property
     def comments(self):
@@ -32,7 +32,7 @@ class Gallery(Base):
 
     @property
     def gallery_items_number(self):
-        return len(self.marionette.find_elements(*self._gallery_items_locator))
+        return self.count_elements(*self._gallery_items_locator)
 
     def tap_first_gallery_item(self):
         first_gallery_item = self.marionette.find_elements(*self._gallery_items_locator)[0]
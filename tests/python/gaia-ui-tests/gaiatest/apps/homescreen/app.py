@@ -28,10 +28,9 @@ class Homescreen(Base):
         search_bar.tap()
 
         # TODO These lines are a workaround for bug 1020974
-        import time
-        time.sleep(1)
         self.marionette.switch_to_frame()
-        time.sleep(1)
+        self.wait_for_element_displayed(By.ID, 'rocketbar-form')
+        self.wait_for_transition(By.ID, 'rocketbar')
         self.marionette.find_element('id', 'rocketbar-form').tap()
 
         from gaiatest.apps.homescreen.regions.search_panel import SearchPanel
@@ -85,8 +84,9 @@ class Homescreen(Base):
         return self.is_element_present(*self._edit_mode_locator)
 
     def tap_collection(self, collection_name):
-        for root_el in self.marionette.find_elements(*self._homescreen_all_icons_locator):
-            if root_el.text == collection_name:
+        for icon in self.query_all(*self._homescreen_all_icons_locator, fields={'name': 'text'}):
+            if icon.name == collection_name:
+                root_el = icon.element
                 self.marionette.execute_script(
                     'arguments[0].scrollIntoView(false);', [root_el])
                 # TODO bug 1043293 introduced a timing/tap race issue here
@@ -118,9 +118,9 @@ class Homescreen(Base):
         self.wait_for_condition(lambda m: len(self.app_elements) >= number_of_apps)
 
     def installed_app(self, app_name):
-        for root_el in self.marionette.find_elements(*self._homescreen_all_icons_locator):
-            if root_el.text == app_name:
-                return self.InstalledApp(self.marionette, root_el)
+        for icon in self.query_all(*self._homescreen_all_icons_locator, fields={'name': 'text'}):
+            if icon.name == app_name:
+                return self.InstalledApp(self.marionette, icon.element)
 
     class InstalledApp(PageRegion):
 
@@ -21,4 +21,4 @@ class CollectionsActivity(Base):
 
     @property
     def collection_name_list(self):
-        return [option.text for option in self.marionette.find_elements(*self._collection_option_locator)]
+        return [option.text for option in self.query_all(*self._collection_option_locator, fields={'text': 'text'})]
@@ -2,8 +2,6 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
-
 from marionette.by import By
 from gaiatest.apps.base import Base
 
@@ -19,8 +17,7 @@ class Activities(Base):
     def __init__(self, marionette):
         Base.__init__(self, marionette)
         self.wait_for_element_displayed(*self._actions_menu_locator)
-        # TODO Difficult intermittent bug 977052
-        time.sleep(1)
+        self.wait_for_transition(*self._actions_menu_locator)
 
     def tap_settings(self):
         self.marionette.find_element(*self._settings_button_locator).tap()
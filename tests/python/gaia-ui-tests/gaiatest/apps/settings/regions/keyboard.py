@@ -25,11 +25,8 @@ class Keyboard(Base):
         self.wait_for_condition(lambda m: self.is_built_in_keyboard_present(language))
 
     def is_built_in_keyboard_present(self, language):
-        for element in self.marionette.find_elements(*self._built_in_keyboard_list_element_locator):
-            if language in element.text:
-                return True
-
-        return False
+        return any(language in element.text for element in
+                   self.query_all(*self._built_in_keyboard_list_element_locator, fields={'text': 'text'}))
 
 
 class KeyboardAddMoreKeyboards(Base):
@@ -2,8 +2,6 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
-
 from marionette.by import By
 from gaiatest.apps.base import Base
 
@@ -56,10 +54,7 @@ class Language(Base):
 
         close_button.tap()
         self.wait_for_element_not_displayed(By.CSS_SELECTOR, 'button.value-option-confirm')
-
-        # TODO we should find something suitable to wait for, but this goes too
-        # fast against desktop builds causing intermittent failures
-        time.sleep(0.2)
+        self.wait_for_transition()
 
         # now back to app
         self.apps.switch_to_displayed_app()
@@ -2,7 +2,6 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
 from marionette.by import By
 from gaiatest.apps.base import Base
 
@@ -36,9 +35,7 @@ class SimManager(Base):
 
         # have to go back to top level to get the B2G select box wrapper
         self.marionette.switch_to_frame()
-        # TODO we should find something suitable to wait for, but this goes too
-        # fast against desktop builds causing intermittent failures
-        time.sleep(0.2)
+        self.wait_for_transition()
 
         li = self.wait_for_element_present(*_list_item_locator)
 
@@ -48,8 +45,7 @@ class SimManager(Base):
         li.tap()
         # no close button for this selection, select on an item brings to 
         # confirmation directly
-
-        time.sleep(0.2)
+        self.wait_for_transition()
 
         # Confirmation page shown upon selection is made
         self.wait_for_element_displayed(*self._confirm_suspended_locator)
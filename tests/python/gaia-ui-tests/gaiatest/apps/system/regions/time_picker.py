@@ -2,8 +2,6 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
-
 from marionette.by import By
 from marionette.marionette import Actions
 
@@ -24,15 +22,12 @@ class TimePicker(Base):
         Base.__init__(self, marionette)
         self.marionette.switch_to_frame()
         self.wait_for_element_displayed(*self._current_element(*self._hour_picker_locator))
-
-        # TODO: wait for the time piker to fade in Bug 1038186
-        time.sleep(2)
+        self.wait_for_transition(*self._time_picker_locator)
 
     def tap_done(self):
         self.marionette.find_element(*self._done_button_locator).tap()
         self.wait_for_element_not_displayed(*self._time_picker_locator)
-        # TODO: wait for the time piker to fade out Bug 1038186
-        time.sleep(2)
+        self.wait_for_transition()
         self.apps.switch_to_displayed_app()
 
     @property
@@ -0,0 +1,127 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from optparse import OptionParser
+import sqlite3
+import sys
+import time
+
+
+def median(values):
+    values = sorted(values)
+    if not values:
+        return None
+    middle = len(values) / 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+class DurationStore(object):
+    """SQLite store of how long each test took, per device type and Gaia revision."""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS durations ('
+            'test_id TEXT NOT NULL, filename TEXT NOT NULL, device TEXT NOT NULL, '
+            'revision TEXT, result TEXT, setup REAL, test REAL, teardown REAL, '
+            'total REAL NOT NULL, recorded REAL NOT NULL)')
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS durations_device_test '
+            'ON durations (device, test_id, recorded)')
+        self.connection.commit()
+
+    def record(self, entries, device, revision=None):
+        """Record a run's durations.
+
+        Each entry is a dictionary with test_id, filename, result and total
+        keys, plus optional setUp, test and tearDown phase durations.
+        """
+        recorded = time.time()
+        self.connection.executemany(
+            'INSERT INTO durations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(e['test_id'], e['filename'], device, revision, e.get('result'),
+              e.get('setUp'), e.get('test'), e.get('tearDown'), e['total'], recorded)
+             for e in entries])
+        self.connection.commit()
+
+    def history(self, device=None):
+        """Returns the recorded totals of each test, oldest first."""
+        query = 'SELECT test_id, filename, total FROM durations'
+        args = ()
+        if device:
+            query += ' WHERE device = ?'
+            args = (device,)
+        history = {}
+        for test_id, filename, total in self.connection.execute(
+                query + ' ORDER BY recorded', args):
+            history.setdefault((test_id, filename), []).append(total)
+        return history
+
+    def file_durations(self, device, runs=5):
+        """Returns the predicted duration of each test file in seconds.
+
+        A test's prediction is the median of its last few runs, and a file's
+        prediction is the sum over the tests it contains.
+        """
+        durations = {}
+        for (test_id, filename), totals in self.history(device).items():
+            durations[filename] = durations.get(filename, 0) + median(totals[-runs:])
+        return durations
+
+    def slowest(self, device=None, limit=20, runs=5):
+        """Returns the slowest tests with their trend, slowest first.
+
+        The trend compares the median of the last few runs with the median of
+        the runs before them, as a fraction of the latter.
+        """
+        report = []
+        for (test_id, filename), totals in self.history(device).items():
+            recent = median(totals[-runs:])
+            previous = median(totals[-2 * runs:-runs])
+            trend = previous and (recent - previous) / previous
+            report.append({'test_id': test_id,
+                           'runs': len(totals),
+                           'median': recent,
+                           'latest': totals[-1],
+                           'trend': trend})
+        report.sort(key=lambda r: r['median'], reverse=True)
+        return report[:limit]
+
+    def close(self):
+        self.connection.close()
+
+
+def cli():
+    parser = OptionParser(usage='%prog [options] database')
+    parser.add_option('--device',
+                      help='only report durations recorded on this device type, '
+                           'for example desktop, qemu or flame')
+    parser.add_option('--limit',
+                      type=int,
+                      default=20,
+                      help='number of tests to report. Default: %default')
+    parser.add_option('--runs',
+                      type=int,
+                      default=5,
+                      help='number of recent runs to take the median of. Default: %default')
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error('You must specify the database to report on.')
+
+    store = DurationStore(args[0])
+    report = store.slowest(options.device, options.limit, options.runs)
+    store.close()
+
+    print '%-80s %5s %9s %9s %7s' % ('Test', 'Runs', 'Median', 'Latest', 'Trend')
+    for r in report:
+        trend = r['trend'] is None and '-' or '%+.0f%%' % (r['trend'] * 100)
+        print '%-80s %5d %8.1fs %8.1fs %7s' % (
+            r['test_id'][-80:], r['runs'], r['median'], r['latest'], trend)
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
@@ -0,0 +1,220 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Reads and writes the results of endurance test runs. This module only uses
+# the standard library and the other standalone modules of this directory, so
+# the tools in tests/endurance can load it without a Marionette client installed.
+#
+# Each run is written to one JSON lines file, with a record on each line:
+#   {"type": "run", ...}          test, device and the averages of the run,
+#                                 always the first line
+#   {"type": "iterations", ...}   the duration of each iteration, in seconds,
+#                                 not counting its pauses
+#   {"type": "checkpoint", ...}   b2g and per-app rss at one checkpoint, in KB
+#   {"type": "memory", ...}       the memory samples of one process, in MB
+# Series are stored as columns of values, and everything needed to compare
+# runs is in the first line, so a directory of runs loads without parsing
+# the rest of each file.
+
+import json
+import os
+import time
+
+from duration_store import median
+from launch_benchmark import percentile
+from memory_sampler import slope
+
+FORMAT = 1
+RESULTS_SUFFIX = '_results.jsonl'
+# written by the Marionette endurance mixins before this format existed
+LEGACY_SUITE_SUMMARY = 'avg_b2g_rss_suite_summary.log'
+
+
+class EnduranceRun(object):
+    """The results of one endurance test run."""
+
+    def __init__(self, test_name, app_under_test=None, iterations=0,
+                 checkpoint_interval=0, completed=None, device=None):
+        self.test_name = test_name
+        self.app_under_test = app_under_test
+        self.iterations = iterations
+        self.checkpoint_interval = checkpoint_interval
+        self.completed = completed
+        # deviceinfo settings, such as os and platform_build_id
+        self.device = device or {}
+        # seconds taken by each iteration
+        self.iteration_durations = []
+        # [{'iteration': n, 'time': t, 'b2g_rss': KB, 'rss_by_app': {origin: KB}}]
+        self.checkpoints = []
+        # {process name: {'time': [...], 'iteration': [...], 'uss': [...], ...}}
+        self.memory_samples = {}
+        # {process name: summary of its memory samples}
+        self.memory_summary = {}
+
+    def add_checkpoint(self, iteration, b2g_rss, rss_by_app=None, timestamp=None):
+        self.checkpoints.append({'iteration': iteration,
+                                 'time': timestamp,
+                                 'b2g_rss': b2g_rss,
+                                 'rss_by_app': rss_by_app or {}})
+
+    @property
+    def b2g_rss(self):
+        return [c['b2g_rss'] for c in self.checkpoints if c['b2g_rss'] is not None]
+
+    @property
+    def rss_by_app(self):
+        """Returns {app origin, or process name: [rss at each checkpoint]}."""
+        series = {}
+        for checkpoint in self.checkpoints:
+            for origin, value in checkpoint['rss_by_app'].items():
+                series.setdefault(origin, []).append(value)
+        return series
+
+    def iteration_summary(self, count=10):
+        """Returns the median, 95th percentile and least squares slope of the
+        iteration durations, and compares the median of the first and last
+        iterations, up to count of each, to show whether iterations slowed down."""
+        durations = self.iteration_durations
+        count = min(count, len(durations) / 2)
+        summary = {'median': median(durations),
+                   'p95': percentile(durations, 95),
+                   'slope': slope(range(1, len(durations) + 1), durations),
+                   'compared': count,
+                   'first_median': None,
+                   'last_median': None,
+                   'change': None}
+        if count:
+            first = median(durations[:count])
+            last = median(durations[-count:])
+            summary.update(first_median=first, last_median=last,
+                           change=first and (last - first) / first)
+        return summary
+
+    def averages(self):
+        """Returns the average rss of b2g under the test name, and of each app
+        under test_name[origin], as compared across runs."""
+        averages = {}
+        if self.b2g_rss:
+            averages[self.test_name] = sum(self.b2g_rss) / len(self.b2g_rss)
+        for origin, values in self.rss_by_app.items():
+            averages['%s[%s]' % (self.test_name, origin)] = sum(values) / len(values)
+        return averages
+
+    def write(self, path):
+        records = [{'type': 'run',
+                    'format': FORMAT,
+                    'test_name': self.test_name,
+                    'app_under_test': self.app_under_test,
+                    'iterations': self.iterations,
+                    'checkpoint_interval': self.checkpoint_interval,
+                    'completed': self.completed,
+                    'device': self.device,
+                    'averages': self.averages(),
+                    'iteration_summary': self.iteration_summary(),
+                    'memory_summary': self.memory_summary},
+                   {'type': 'iterations',
+                    'duration': self.iteration_durations}]
+        records.extend(dict(checkpoint, type='checkpoint') for checkpoint in self.checkpoints)
+        records.extend(dict(columns, type='memory', process=process)
+                       for process, columns in sorted(self.memory_samples.items()))
+        with open(path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record, sort_keys=True) + '\n')
+
+    @classmethod
+    def read(cls, path):
+        """Read a run from a results file, or from the summary log of a run
+        written before results files existed."""
+        if not path.endswith(RESULTS_SUFFIX):
+            return cls.read_summary_log(path)
+        with open(path) as f:
+            header = json.loads(f.readline())
+            run = cls(header['test_name'], header['app_under_test'], header['iterations'],
+                      header['checkpoint_interval'], header['completed'], header['device'])
+            run.memory_summary = header['memory_summary']
+            for line in f:
+                record = json.loads(line)
+                kind = record.pop('type')
+                if kind == 'iterations':
+                    run.iteration_durations = record['duration']
+                elif kind == 'checkpoint':
+                    run.checkpoints.append(record)
+                elif kind == 'memory':
+                    run.memory_samples[record.pop('process')] = record
+        return run
+
+    @classmethod
+    def read_summary_log(cls, path):
+        """Read a run from a checkpoint_*_summary.log file."""
+        summary = read_key_values(path)
+        missing = set(['test_name', 'total_iterations', 'checkpoint_interval', 'b2g_rss']) - set(summary)
+        if missing:
+            raise ValueError('%s is missing %s' % (path, ', '.join(sorted(missing))))
+        completed = summary.get('completed')
+        run = cls(summary['test_name'], summary.get('app_under_test'),
+                  int(summary['total_iterations']), int(summary['checkpoint_interval']),
+                  completed and time.mktime(time.strptime(completed, '%Y%m%d%H%M%S')))
+        rss_by_app = dict((key[len('rss_by_app['):-1], parse_ints(value))
+                          for key, value in summary.items() if key.startswith('rss_by_app['))
+        for i, b2g_rss in enumerate(parse_ints(summary['b2g_rss'])):
+            run.add_checkpoint(
+                min((i + 1) * run.checkpoint_interval, run.iterations), b2g_rss,
+                dict((origin, values[i]) for origin, values in rss_by_app.items() if i < len(values)))
+        return run
+
+
+def read_key_values(path):
+    """Returns {key: value} from the 'key: value' lines of a log file."""
+    values = {}
+    with open(path) as f:
+        for line in f:
+            key, separator, value = line.strip().partition(': ')
+            if separator:
+                values[key] = value
+    return values
+
+
+def parse_ints(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def read_averages(path):
+    """Returns the averages of a run from the first line of its results file."""
+    with open(path) as f:
+        return json.loads(f.readline())['averages']
+
+
+def find_runs(directory):
+    """Returns the results files in a directory, or if there are none, the
+    summary logs of runs written before results files existed."""
+    names = sorted(os.listdir(directory))
+    runs = [name for name in names if name.endswith(RESULTS_SUFFIX)]
+    if not runs:
+        runs = [name for name in names
+                if name.endswith('_summary.log') and name != LEGACY_SUITE_SUMMARY]
+    return [os.path.join(directory, name) for name in runs]
+
+
+def load_averages(path):
+    """Returns the averages of every run in a directory of results files, or
+    in a results file, or in an avg_b2g_rss_suite_summary.log file.
+
+    A directory without results files falls back to its suite summary log.
+    Returns an empty dictionary if the path does not exist.
+    """
+    paths = [path]
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                 if name.endswith(RESULTS_SUFFIX)]
+        if not paths:
+            paths = [os.path.join(path, LEGACY_SUITE_SUMMARY)]
+    averages = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        if path.endswith(RESULTS_SUFFIX):
+            averages.update(read_averages(path))
+        else:
+            averages.update((key, int(value)) for key, value in read_key_values(path).items())
+    return averages
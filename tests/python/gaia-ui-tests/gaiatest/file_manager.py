@@ -3,8 +3,12 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 from abc import ABCMeta, abstractmethod
+import hashlib
+from multiprocessing.pool import ThreadPool
 import os
+import re
 import shutil
+import threading
 
 import mozlog
 
@@ -18,6 +22,10 @@ class GaiaFileManager(object):
         self._logger.setLevel(log_level)
         self.device = device
 
+    @abstractmethod
+    def clear_dirs(self, paths):
+        """Remove everything inside each directory, returning the paths removed."""
+
     @abstractmethod
     def copy_file(self, source, destination):
         """Copy a file."""
@@ -27,22 +35,31 @@ class GaiaFileManager(object):
         """Return true if path exists and is a directory."""
         return
 
-    def duplicate_file(self, path, count):
-        """Create duplicates of a file on the system and remove original."""
-        original = path
+    def _duplicate_name(self, path):
+        """Return the prefix and suffix either side of a duplicate's index."""
         path, sep, filename = path.rpartition('/')
+        # Make the remote filename unique by including an index
+        if '.' in filename:
+            name, extension = filename.rsplit('.', 1)
+            return '/'.join([path, name + '_']), '.' + extension
+        return '/'.join([path, filename + '_']), ''
+
+    def duplicate_file(self, path, count, link=False):
+        """Create duplicates of a file on the system and remove original.
+
+        If link is true the duplicates may be hard links to the original
+        where the file system supports them, so must not be modified.
+        """
+        prefix, suffix = self._duplicate_name(path)
         # We copy the file we've just created rather than pushing it
         # multiple times, which would be much slower.
         for i in range(1, count + 1):
-            # Make the remote filename unique by including an index
-            if '.' in filename:
-                indexed_filename = '_%d.'.join(iter(
-                    filename.rsplit('.', 1))) % i
-            else:
-                indexed_filename = '%s_%d' % (filename, i)
-            duplicate = '/'.join([path, indexed_filename])
-            self.copy_file(original, duplicate)
-        self.remove(original)
+            self.copy_file(path, '%s%d%s' % (prefix, i, suffix))
+        self.remove(path)
+
+    @abstractmethod
+    def existing_dirs(self, paths):
+        """Return the paths that exist and are directories."""
 
     @abstractmethod
     def file_exists(self, path):
@@ -59,16 +76,113 @@ class GaiaFileManager(object):
         """Make directory structure."""
 
     @abstractmethod
-    def push_file(self, local_path, remote_path=None, count=1):
-        """Push a file to the system."""
+    def push_file(self, local_path, remote_path=None, count=1, link=False, make_dirs=True):
+        """Push a file to the system, duplicated count times if more than one.
+
+        If make_dirs is false the remote path must already exist.
+        """
+
+    def remote_file(self, local_path, remote_path=None):
+        """Return where push_file puts the file."""
+        # If remote path is not specified, use the storage path
+        remote_path = remote_path or self.device.storage_path
+        filename = local_path.rpartition(os.path.sep)[-1]
+        return '/'.join([remote_path, filename])
+
+    def stage_file(self, local_path):
+        """Prepare a file for pushing, returning where it will be copied from."""
+        return local_path
 
     @abstractmethod
     def remove(self, path):
         """Remove file or directory."""
 
+    def remove_all(self, paths):
+        """Remove each file or directory."""
+        for path in paths:
+            self.remove(path)
+
+    def remove_paths(self, paths):
+        """Remove each file or directory, taking paths literally rather than
+        as wildcards."""
+        for path in paths:
+            self.remove(path)
+
 
 class GaiaDeviceFileManager(GaiaFileManager):
-    """File manager for Gaia instance running on a B2G device or emulator."""
+    """File manager for Gaia instance running on a B2G device or emulator.
+
+    Pushed files are kept in a staging directory outside of the storage
+    that is cleared between tests, named by the SHA-1 of their content, so
+    each file only goes over adb once and is then copied on the device.
+    Files are pushed under a temporary name and only renamed to their digest
+    once the push succeeds, so an interrupted push is never reused.
+    """
+
+    staging_path = '/data/local/tmp/gaiatest-resources'
+
+    # {(host, port): set(digest)} of the files staged on each device
+    _staged = {}
+    # {digest: threading.Lock} held while each file is staged
+    _staging_locks = {}
+    _staged_lock = threading.Lock()
+
+    # {(path, size, mtime): digest} of the local files hashed
+    _digests = {}
+
+    def _staged_digests(self):
+        key = self.device.marionette.host, self.device.marionette.port
+        if key not in GaiaDeviceFileManager._staged:
+            # pick up files staged by earlier runs
+            if self.dir_exists(self.staging_path):
+                # ignore the temporary files of interrupted pushes
+                staged = set(name for name in self.list_items(self.staging_path)
+                             if re.match('^[0-9a-f]{40}$', name))
+            else:
+                staged = set()
+            GaiaDeviceFileManager._staged[key] = staged
+        return GaiaDeviceFileManager._staged[key]
+
+    def _digest(self, path):
+        stat = os.stat(path)
+        key = path, stat.st_size, stat.st_mtime
+        if key not in GaiaDeviceFileManager._digests:
+            sha1 = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), ''):
+                    sha1.update(chunk)
+            GaiaDeviceFileManager._digests[key] = sha1.hexdigest()
+        return GaiaDeviceFileManager._digests[key]
+
+    def stage_file(self, local_path):
+        """Push a file to the staging directory unless it is already there.
+
+        Returns the path of the staged file on the device.
+        """
+        digest = self._digest(local_path)
+        staged = '/'.join([self.staging_path, digest])
+        # GaiaAsyncFileManager may push the same file from several threads
+        with GaiaDeviceFileManager._staged_lock:
+            digests = self._staged_digests()
+            lock = GaiaDeviceFileManager._staging_locks.setdefault(digest, threading.Lock())
+        with lock:
+            if digest not in digests:
+                self._logger.debug('Staging: %s as: %s' % (local_path, staged))
+                self.make_dirs(staged)
+                partial = '%s.%d.part' % (staged, os.getpid())
+                self.device.manager.pushFile(local_path, partial)
+                self.device.manager.shellCheckOutput(['mv', partial, staged])
+                digests.add(digest)
+        return staged
+
+    def clear_dirs(self, paths):
+        if not paths:
+            return []
+        self._logger.debug('Clearing: %s' % ', '.join(paths))
+        script = ('for d in %s; do for f in "$d"/* "$d"/.[!.]*; do '
+                  'if [ -e "$f" ]; then rm -r "$f" && echo "$f"; fi; done; done' %
+                  ' '.join('"%s"' % path for path in paths))
+        return self.device.manager.shellCheckOutput(['sh', '-c', script]).splitlines()
 
     def copy_file(self, source, destination):
         self._logger.debug('Copying: %s to: %s' % (source, destination))
@@ -78,6 +192,14 @@ class GaiaDeviceFileManager(GaiaFileManager):
         self._logger.debug('Checking for existance of directory: %s' % path)
         return self.device.manager.dirExists(path)
 
+    def existing_dirs(self, paths):
+        if not paths:
+            return []
+        self._logger.debug('Checking for existance of directories: %s' % ', '.join(paths))
+        script = ('for d in %s; do if [ -d "$d" ]; then echo "$d"; fi; done' %
+                  ' '.join('"%s"' % path for path in paths))
+        return self.device.manager.shellCheckOutput(['sh', '-c', script]).splitlines()
+
     def file_exists(self, path):
         self._logger.debug('Checking for existance of file: %s' % path)
         return self.device.manager.fileExists(path)
@@ -89,24 +211,78 @@ class GaiaDeviceFileManager(GaiaFileManager):
     def make_dirs(self, filename):
         self.device.manager.mkDirs(filename)
 
-    def push_file(self, local_path, remote_path=None, count=1):
-        # If remote path is not specified, use the storage path
-        remote_path = remote_path or self.device.storage_path
-        filename = local_path.rpartition(os.path.sep)[-1]
-        remote_file = '/'.join([remote_path, filename])
-        self.make_dirs(remote_file)
-        self.device.manager.pushFile(local_path, remote_file)
+    def _duplicate_script(self, source, path, count, link):
+        # Make every copy from a single shell script, rather than running
+        # adb once per copy. Hard links fall back to copying on file systems
+        # without them, such as the FAT formatted SD card on most devices.
+        prefix, suffix = self._duplicate_name(path)
+        copy = 'dd if="%s" of="%s${i}%s" 2>/dev/null' % (source, prefix, suffix)
+        if link:
+            copy = 'ln "%s" "%s${i}%s" 2>/dev/null || %s' % (source, prefix, suffix, copy)
+        return 'i=1; while [ $i -le %d ]; do %s || exit 1; i=$((i + 1)); done' % (count, copy)
+
+    def duplicate_file(self, path, count, link=False):
+        self._logger.debug('Duplicating: %s %d times' % (path, count))
+        script = '%s; rm "%s"' % (self._duplicate_script(path, path, count, link), path)
+        self.device.manager.shellCheckOutput(['sh', '-c', script])
+
+    def push_file(self, local_path, remote_path=None, count=1, link=False, make_dirs=True):
+        remote_file = self.remote_file(local_path, remote_path)
+        if make_dirs:
+            self.make_dirs(remote_file)
+        staged = self.stage_file(local_path)
+        self._logger.debug('Copying: %s to: %s' % (staged, remote_file))
+        script = 'dd if="%s" of="%s" 2>/dev/null' % (staged, remote_file)
         if count > 1:
-            self.duplicate_file(remote_file, count)
+            # link to the copy rather than the staged file, so that changes
+            # to the duplicates can never reach the staging directory
+            self._logger.debug('Duplicating: %s %d times' % (remote_file, count))
+            script = '%s || exit 1; %s; rm "%s"' % (
+                script, self._duplicate_script(remote_file, remote_file, count, link), remote_file)
+        self.device.manager.shellCheckOutput(['sh', '-c', script])
 
     def remove(self, path):
         self._logger.debug('Removing: %s' % path)
         self.device.manager.removeDir(path)
 
+    def remove_all(self, paths):
+        # paths are left unquoted so that they may contain wildcards
+        self._logger.debug('Removing: %s' % ', '.join(paths))
+        self.device.manager.shellCheckOutput(
+            ['sh', '-c', 'for p in %s; do rm -r $p 2>/dev/null; done; true' % ' '.join(paths)])
+
+    def remove_paths(self, paths):
+        if not paths:
+            return
+        self._logger.debug('Removing: %s' % ', '.join(paths))
+        # single quoted, so that names may contain spaces and shell characters
+        self.device.manager.shellCheckOutput(
+            ['sh', '-c', 'rm -r %s' % ' '.join("'%s'" % path.replace("'", "'\\''") for path in paths)])
+
 
 class GaiaLocalFileManager(GaiaFileManager):
     """File manager for Gaia instance running locally such as desktop B2G."""
 
+    # how many items to remove at once when clearing directories
+    clear_threads = 4
+
+    def clear_dirs(self, paths):
+        items = []
+        for path in paths:
+            path = os.path.normpath(path)
+            if os.path.isdir(path):
+                items.extend(os.path.join(path, item) for item in os.listdir(path))
+        if not items:
+            return []
+        self._logger.debug('Clearing: %s' % ', '.join(paths))
+        pool = ThreadPool(min(self.clear_threads, len(items)))
+        try:
+            pool.map(self.remove, items)
+        finally:
+            pool.close()
+            pool.join()
+        return items
+
     def copy_file(self, source, destination):
         source = os.path.normpath(source)
         destination = os.path.normpath(destination)
@@ -118,6 +294,9 @@ class GaiaLocalFileManager(GaiaFileManager):
         self._logger.debug('Checking for existance of directory: %s' % path)
         return os.path.isdir(path)
 
+    def existing_dirs(self, paths):
+        return [path for path in paths if os.path.isdir(os.path.normpath(path))]
+
     def file_exists(self, path):
         path = os.path.normpath(path)
         self._logger.debug('Checking for existance of file: %s' % path)
@@ -135,12 +314,25 @@ class GaiaLocalFileManager(GaiaFileManager):
             self._logger.debug('Making path: %s' % containing)
             os.makedirs(containing)
 
-    def push_file(self, local_path, remote_path=None, count=1):
-        # If remote path is not specified, use the storage path
-        remote_path = remote_path or self.device.storage_path
-        filename = local_path.rpartition(os.path.sep)[-1]
-        remote_file = '/'.join([remote_path, filename])
-        self.make_dirs(remote_file)
+    def duplicate_file(self, path, count, link=False):
+        if not link or not hasattr(os, 'link'):
+            return GaiaFileManager.duplicate_file(self, path, count)
+        path = os.path.normpath(path)
+        prefix, suffix = self._duplicate_name(path)
+        self._logger.debug('Linking: %s %d times' % (path, count))
+        for i in range(1, count + 1):
+            duplicate = '%s%d%s' % (prefix, i, suffix)
+            try:
+                os.link(path, duplicate)
+            except OSError:
+                # the file system does not support hard links
+                shutil.copy(path, duplicate)
+        os.remove(path)
+
+    def push_file(self, local_path, remote_path=None, count=1, link=False, make_dirs=True):
+        remote_file = self.remote_file(local_path, remote_path)
+        if make_dirs:
+            self.make_dirs(remote_file)
 
         path = os.path.normpath(remote_file)
         if os.path.isdir(path):
@@ -151,7 +343,7 @@ class GaiaLocalFileManager(GaiaFileManager):
         self._logger.debug('Pushing: %s to: %s' % (local_path, path))
         self.copy_file(local_path, path)
         if count > 1:
-            self.duplicate_file(remote_file, count)
+            self.duplicate_file(remote_file, count, link)
 
     def remove(self, path):
         path = os.path.normpath(path)
@@ -161,3 +353,86 @@ class GaiaLocalFileManager(GaiaFileManager):
         elif os.path.isdir(path):
             self._logger.debug('Removing directory: %s' % path)
             shutil.rmtree(path)
+
+
+class GaiaAsyncFileManager(object):
+    """Runs another file manager's operations concurrently on a thread pool.
+
+    Each operation is queued and returns a multiprocessing AsyncResult
+    straight away. wait blocks until everything queued so far is done and
+    raises the first error, so several pushes take about as long as the
+    slowest of them. Pushes stage their file while the directory they go
+    in is made, and each directory is only made once per wait. Used as a
+    context manager it waits and shuts the pool down on exit.
+    """
+
+    def __init__(self, file_manager, threads=4):
+        self.file_manager = file_manager
+        self._pool = ThreadPool(threads)
+        self._pending = []
+        # {path: threading.Event} set once each directory has been made
+        self._dirs = {}
+        self._dirs_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.wait()
+        finally:
+            self.close()
+
+    def _submit(self, method, *args):
+        result = self._pool.apply_async(method, args)
+        self._pending.append(result)
+        return result
+
+    def _make_dirs(self, filename):
+        # The first push into a directory makes it and the others wait for
+        # that, rather than queueing it, which could deadlock a full pool.
+        path = filename.rpartition('/')[0]
+        with self._dirs_lock:
+            made = self._dirs.get(path)
+            first = made is None
+            if first:
+                made = self._dirs[path] = threading.Event()
+        if first:
+            try:
+                self.file_manager.make_dirs(filename)
+            finally:
+                made.set()
+        else:
+            made.wait()
+
+    def _push_file(self, local_path, remote_path, count, link):
+        self.file_manager.stage_file(local_path)
+        self._make_dirs(self.file_manager.remote_file(local_path, remote_path))
+        self.file_manager.push_file(local_path, remote_path, count, link, make_dirs=False)
+
+    def copy_file(self, source, destination):
+        return self._submit(self.file_manager.copy_file, source, destination)
+
+    def make_dirs(self, filename):
+        return self._submit(self._make_dirs, filename)
+
+    def push_file(self, local_path, remote_path=None, count=1, link=False):
+        return self._submit(self._push_file, local_path, remote_path, count, link)
+
+    def remove(self, path):
+        return self._submit(self.file_manager.remove, path)
+
+    def wait(self):
+        """Wait for everything queued, returning the results in order."""
+        pending, self._pending = self._pending, []
+        try:
+            return [result.get() for result in pending]
+        finally:
+            # later operations may have removed the directories
+            with self._dirs_lock:
+                self._dirs = {}
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
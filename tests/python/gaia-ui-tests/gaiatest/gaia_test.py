@@ -2,9 +2,15 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from contextlib import contextmanager
+import functools
+import hashlib
+import inspect
+import itertools
 import json
 import os
 import shutil
+import socket
 import tempfile
 import time
 
@@ -15,9 +21,351 @@ from marionette import expected
 from marionette.errors import NoSuchElementException
 from marionette.errors import StaleElementException
 from marionette.errors import InvalidResponseException
-from marionette.wait import Wait
+from marionette.errors import MarionetteException
+from marionette.wait import Wait, DEFAULT_INTERVAL, DEFAULT_TIMEOUT
+from mozlog.structured.structuredlog import get_default_logger
 
-from file_manager import GaiaDeviceFileManager, GaiaLocalFileManager
+from endurance_results import EnduranceRun, RESULTS_SUFFIX
+from file_manager import GaiaAsyncFileManager, GaiaDeviceFileManager, GaiaLocalFileManager
+from memory_sampler import MemorySampler, parse_procrank
+from wire_profiler import WireProfiler
+
+
+class AtomCache(object):
+    """Registry of the JS atoms imported into each Marionette session.
+
+    Marionette keeps imported scripts until the session is deleted, so each
+    atom only needs sending once per session and context. Atoms are tracked
+    by the SHA-1 of their content, so an edited atom is imported again.
+    """
+
+    # {(session, context): {path: digest}}
+    _imported = {}
+
+    @classmethod
+    def _key(cls, marionette, context):
+        return marionette.session, context or marionette.CONTEXT_CONTENT
+
+    @classmethod
+    def _digest(cls, path):
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    @classmethod
+    def is_imported(cls, marionette, path, context=None):
+        imported = cls._imported.get(cls._key(marionette, context), {})
+        return imported.get(path) == cls._digest(path)
+
+    @classmethod
+    def import_script(cls, marionette, path, context=None):
+        """Import the atom into the current context, unless it already is.
+
+        The caller is responsible for switching Marionette to the given
+        context, which defaults to content.
+        """
+        digest = cls._digest(path)
+        imported = cls._imported.setdefault(cls._key(marionette, context), {})
+        if imported.get(path) != digest:
+            marionette.import_script(path)
+            imported[path] = digest
+
+    @classmethod
+    def forget(cls, marionette, path, context=None):
+        cls._imported.get(cls._key(marionette, context), {}).pop(path, None)
+
+    @classmethod
+    def invalidate(cls):
+        cls._imported.clear()
+
+
+class FrameTracker(object):
+    """Tracks the context and frame of a Marionette client's session.
+
+    Once installed, every command the client sends goes through the tracker,
+    including switches made directly by tests. Switching to the context that
+    is already current, or to the top level frame when already there, is
+    skipped. Setting the context is deferred until the next command, so
+    switching to chrome and straight back to content sends nothing.
+    """
+
+    def __init__(self, marionette):
+        self.marionette = marionette
+        self._send_message = marionette._send_message
+        self._session = None
+        # context of the server, or None if unknown
+        self.context = None
+        # context to set before the next command
+        self.pending_context = None
+        # {context: True if in the focused top level frame, False if in the
+        # unfocused top level frame}, missing while the frame is unknown
+        self.top_frame = {}
+
+    @classmethod
+    def install(cls, marionette):
+        tracker = getattr(marionette, 'frame_tracker', None)
+        if tracker is None or marionette._send_message != tracker.send_message:
+            tracker = marionette.frame_tracker = cls(marionette)
+            marionette._send_message = tracker.send_message
+        return tracker
+
+    def forget(self):
+        self.context = None
+        self.pending_context = None
+        self.top_frame = {}
+
+    def send_message(self, command, response_key='ok', **kwargs):
+        __tracebackhide__ = True
+        if command == 'newSession':
+            response = self._send_message(command, response_key, **kwargs)
+            # new sessions start in the top level content frame
+            self._session = response
+            self.context = self.marionette.CONTEXT_CONTENT
+            self.pending_context = None
+            self.top_frame = {self.context: True}
+            return response
+        if self._session != self.marionette.session:
+            self._session = self.marionette.session
+            self.forget()
+
+        if command == 'setContext':
+            self.pending_context = kwargs['value']
+            return True
+        if self.pending_context and self.pending_context != self.context:
+            try:
+                self._send_message('setContext', 'ok', value=self.pending_context)
+            except Exception:
+                self.forget()
+                raise
+            self.context = self.pending_context
+        self.pending_context = None
+
+        if command not in ('switchToFrame', 'switchToWindow'):
+            return self._send_message(command, response_key, **kwargs)
+
+        to_top = command == 'switchToFrame' and kwargs.get('id') is None and 'element' not in kwargs
+        focus = kwargs.get('focus', True)
+        if to_top and self.context in self.top_frame and (self.top_frame[self.context] or not focus):
+            return True
+        try:
+            response = self._send_message(command, response_key, **kwargs)
+        except Exception:
+            self.forget()
+            raise
+        if command == 'switchToWindow' or not self.context:
+            self.top_frame = {}
+        elif to_top:
+            self.top_frame[self.context] = focus
+        else:
+            self.top_frame.pop(self.context, None)
+        return response
+
+
+class PhaseTimer(object):
+    """Times the nested phases of a test.
+
+    Each phase is recorded under the path of the phases enclosing it, joined
+    by '/', and the durations and counts of phases with the same path are
+    added together.
+    """
+
+    # timer of the test being run, used by timed methods
+    current = None
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        # {path: seconds}
+        self.durations = {}
+        # {path: number of times the phase ran}
+        self.counts = {}
+        self._path = []
+
+    @contextmanager
+    def phase(self, name):
+        self._path.append(name)
+        path = '/'.join(self._path)
+        start = time.time()
+        try:
+            yield
+        finally:
+            duration = time.time() - start
+            self._path.pop()
+            self.durations[path] = self.durations.get(path, 0) + duration
+            self.counts[path] = self.counts.get(path, 0) + 1
+            if self.logger:
+                self.logger.debug('PHASE %s %.3fs' % (path, duration))
+
+    def report(self):
+        """Returns the phases as an indented tree, with their durations and counts."""
+        lines = []
+        for path in sorted(self.durations):
+            names = path.split('/')
+            lines.append('%8.3fs %5dx %s%s' % (
+                self.durations[path], self.counts[path], '  ' * (len(names) - 1), names[-1]))
+        return '\n'.join(lines)
+
+    @classmethod
+    def timed(cls, name):
+        """Decorator timing each call as a phase of the running test, if any."""
+        def decorator(method):
+            @functools.wraps(method)
+            def timed_method(*args, **kwargs):
+                __tracebackhide__ = True
+                if cls.current is None:
+                    return method(*args, **kwargs)
+                with cls.current.phase(name):
+                    return method(*args, **kwargs)
+            return timed_method
+        return decorator
+
+
+def timed_methods(cls):
+    """Class decorator timing each call to a public method or property as a phase."""
+    for name, attr in cls.__dict__.items():
+        if name.startswith('_'):
+            continue
+        phase = '%s.%s' % (cls.__name__, name)
+        if inspect.isfunction(attr):
+            setattr(cls, name, PhaseTimer.timed(phase)(attr))
+        elif isinstance(attr, property):
+            setattr(cls, name, property(
+                attr.fget and PhaseTimer.timed(phase)(attr.fget),
+                attr.fset and PhaseTimer.timed(phase)(attr.fset),
+                attr.fdel, attr.__doc__))
+    return cls
+
+
+class ElementWait(object):
+    """Waits for an element from within the page instead of polling for it.
+
+    The gaia_wait.js atom checks the condition whenever the DOM changes or a
+    transition or animation ends, so a wait costs one round trip however
+    long it takes. Displayedness can only be approximated in JS, so waits
+    return the time left for confirming the condition with Marionette.
+    """
+
+    strategies = [By.ID, By.NAME, By.CLASS_NAME, By.TAG_NAME, By.CSS_SELECTOR, By.XPATH]
+
+    # the longest a page object should wait for a transition, in seconds
+    transition_timeout = 2
+
+    def __init__(self, marionette):
+        self.marionette = marionette
+        self.js = os.path.abspath(os.path.join(__file__, os.path.pardir, 'atoms', "gaia_wait.js"))
+
+    def _timeout(self, timeout):
+        # the same default as marionette.wait.Wait
+        return timeout or (self.marionette.timeout and self.marionette.timeout / 1000.0) or DEFAULT_TIMEOUT
+
+    def until(self, by, locator, state, timeout=None):
+        """Block until the element is 'present', 'not present', 'displayed' or 'not displayed'.
+
+        Returns the remaining timeout in seconds, which is the whole timeout
+        if the locator strategy is not supported or the wait failed.
+        """
+        timeout = self._timeout(timeout)
+        if by not in self.strategies:
+            return timeout
+        end = time.time() + timeout
+        try:
+            AtomCache.import_script(self.marionette, self.js)
+            self.marionette.execute_async_script(
+                'GaiaWait.waitFor.apply(GaiaWait, arguments)',
+                [by, locator, state, int(timeout * 1000)],
+                script_timeout=int(timeout * 1000) + 5000)
+        except MarionetteException:
+            # the atom may not be in the current context, or the page unloaded
+            AtomCache.forget(self.marionette, self.js)
+            return timeout
+        # leave enough time for the condition to be checked at least once
+        return max(end - time.time(), DEFAULT_INTERVAL)
+
+    def is_present(self, by, locator):
+        """Returns whether the element is present, or None if that can't be checked in JS."""
+        if by not in self.strategies:
+            return None
+        try:
+            AtomCache.import_script(self.marionette, self.js)
+            return self.marionette.execute_script(
+                'return GaiaWait.isPresent.apply(GaiaWait, arguments)', [by, locator])
+        except MarionetteException:
+            AtomCache.forget(self.marionette, self.js)
+            return None
+
+    def transition(self, by=None, locator=None, timeout=None):
+        """Block until transitions in the element, or the whole document, have settled.
+
+        Returns False if they were still running after the timeout, which
+        defaults to transition_timeout seconds, or None if the wait failed.
+        """
+        if by is not None and by not in self.strategies:
+            return None
+        timeout = timeout or self.transition_timeout
+        try:
+            AtomCache.import_script(self.marionette, self.js)
+            return self.marionette.execute_async_script(
+                'GaiaWait.waitForTransition.apply(GaiaWait, arguments)',
+                [by, locator, int(timeout * 1000)],
+                script_timeout=int(timeout * 1000) + 5000)
+        except MarionetteException:
+            AtomCache.forget(self.marionette, self.js)
+            return None
+
+    def expect_event(self, name):
+        """Start counting the named event on the current frame's window."""
+        AtomCache.import_script(self.marionette, self.js)
+        self.marionette.execute_script(
+            'GaiaWait.expectEvent.apply(GaiaWait, arguments)', [name], new_sandbox=False)
+
+    def event(self, name, timeout=None):
+        """Block until the named event has fired since expect_event was called.
+
+        Returns whether it fired before the timeout.
+        """
+        timeout = self._timeout(timeout)
+        AtomCache.import_script(self.marionette, self.js)
+        return self.marionette.execute_async_script(
+            'GaiaWait.waitForEvent.apply(GaiaWait, arguments)',
+            [name, int(timeout * 1000)],
+            new_sandbox=False,
+            script_timeout=int(timeout * 1000) + 5000)
+
+
+class Snapshot(object):
+    """Values read from an element by ElementQuery, along with the element itself."""
+
+    def __init__(self, element, values):
+        self.element = element
+        self.__dict__.update(values)
+
+    def __repr__(self):
+        return '<Snapshot %r>' % dict((k, v) for k, v in self.__dict__.items() if k != 'element')
+
+
+class ElementQuery(object):
+    """Reads many elements in a single round trip using the gaia_query.js atom.
+
+    Fields map a name to what to read: 'text', 'displayed', 'rect' or '@' and
+    an attribute name, or a (field, css selector) tuple to read it from the
+    first matching descendant instead. Text leaves out descendants that are not
+    displayed, as element.text does. Displayedness is only approximated.
+    """
+
+    def __init__(self, marionette):
+        self.marionette = marionette
+        self.js = os.path.abspath(os.path.join(__file__, os.path.pardir, 'atoms', "gaia_query.js"))
+
+    def query_all(self, by, locator, fields=None):
+        fields = dict((name, isinstance(field, basestring) and [field, None] or list(field))
+                      for name, field in (fields or {}).items())
+        AtomCache.import_script(self.marionette, self.js)
+        results = self.marionette.execute_script(
+            'return GaiaQuery.queryAll.apply(GaiaQuery, arguments)', [by, locator, fields])
+        return [Snapshot(element, values) for element, values in results]
+
+    def count(self, by, locator):
+        AtomCache.import_script(self.marionette, self.js)
+        return self.marionette.execute_script(
+            'return GaiaQuery.count.apply(GaiaQuery, arguments)', [by, locator])
 
 
 class GaiaApp(object):
@@ -33,12 +381,14 @@ class GaiaApp(object):
         return self.__dict__ == other.__dict__
 
 
+@timed_methods
 class GaiaApps(object):
 
     def __init__(self, marionette):
         self.marionette = marionette
+        FrameTracker.install(self.marionette)
         js = os.path.abspath(os.path.join(__file__, os.path.pardir, 'atoms', "gaia_apps.js"))
-        self.marionette.import_script(js)
+        AtomCache.import_script(self.marionette, js)
 
     def get_permission(self, app_name, permission_name):
         self.marionette.switch_to_frame()
@@ -63,6 +413,20 @@ class GaiaApps(object):
             self.marionette.switch_to_frame(app.frame_id)
         return app
 
+    def measure_launch(self, name, launch_timeout=None):
+        """Launch the app, and return how long it took in milliseconds.
+
+        Returns a dictionary with whether the launch was cold, the time until
+        the app was opened and, for cold launches, the time until it loaded.
+        """
+        self.marionette.switch_to_frame()
+        result = self.marionette.execute_async_script(
+            "GaiaApps.measureLaunchWithName('%s')" % name, script_timeout=launch_timeout)
+        assert result, "Failed to launch app with name '%s'" % name
+        return {'cold': result['cold'],
+                'open': result['opened'] - result['start'],
+                'load': result['loaded'] - result['start'] if result.get('loaded') else None}
+
     @property
     def displayed_app(self):
         self.marionette.switch_to_frame()
@@ -135,6 +499,7 @@ class GaiaApps(object):
         return result
 
 
+@timed_methods
 class GaiaData(object):
 
     def __init__(self, marionette, testvars=None):
@@ -142,13 +507,14 @@ class GaiaData(object):
         self.marionette = marionette
         self.testvars = testvars or {}
         js = os.path.abspath(os.path.join(__file__, os.path.pardir, 'atoms', "gaia_data_layer.js"))
-        self.marionette.import_script(js)
+        AtomCache.import_script(self.marionette, js)
 
         # TODO Bugs 1043562/1049489 To perform ContactsAPI scripts from the chrome context, we need
         # to import the js file into chrome context too
-        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        self.marionette.import_script(js)
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        if not AtomCache.is_imported(self.marionette, js, self.marionette.CONTEXT_CHROME):
+            self.marionette.set_context(self.marionette.CONTEXT_CHROME)
+            AtomCache.import_script(self.marionette, js, self.marionette.CONTEXT_CHROME)
+            self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
 
     def set_time(self, date_number):
         self.marionette.set_context(self.marionette.CONTEXT_CHROME)
@@ -163,6 +529,14 @@ class GaiaData(object):
         self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
         return result
 
+    @property
+    def contact_count(self):
+        """Returns the number of contacts, or None if they could not be counted."""
+        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
+        result = self.marionette.execute_async_script('return GaiaDataLayer.getContactCount();', special_powers=True)
+        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        return result
+
     @property
     def sim_contacts(self):
         # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
@@ -180,11 +554,38 @@ class GaiaData(object):
         assert result, 'Unable to insert contact %s' % contact
         self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
 
+    def insert_contacts(self, contacts, batch_size=100, callback=None):
+        """Insert contacts in batches of batch_size, each saved by a single script.
+
+        Contacts can be any iterable, so large workloads can be generated as
+        they are inserted. If given, callback is called with the number of
+        contacts inserted so far after each batch.
+        """
+        contacts = iter(contacts)
+        inserted = 0
+        # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
+        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
+        try:
+            while True:
+                batch = [contact.create_mozcontact() for contact in itertools.islice(contacts, batch_size)]
+                if not batch:
+                    break
+                timeout = max(self.marionette.timeout or 60000, 100 * len(batch))
+                result = self.marionette.execute_async_script(
+                    'return GaiaDataLayer.insertContacts(%s);' % json.dumps(batch),
+                    special_powers=True, script_timeout=timeout)
+                assert result == len(batch), 'Unable to insert %d of %d contacts' % (len(batch) - (result or 0), len(batch))
+                inserted += len(batch)
+                if callback:
+                    callback(inserted)
+        finally:
+            self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        return inserted
 
     def remove_all_contacts(self):
         # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
         self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        timeout = max(self.marionette.timeout or 60000, 1000 * len(self.all_contacts))
+        timeout = self.marionette.timeout or 60000
         result = self.marionette.execute_async_script('return GaiaDataLayer.removeAllContacts();', special_powers=True, script_timeout=timeout)
         assert result, 'Unable to remove all contacts'
         self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
@@ -202,6 +603,14 @@ class GaiaData(object):
         result = self.marionette.execute_async_script('return GaiaDataLayer.setSetting("%s", %s)' % (name, value), special_powers=True)
         assert result, "Unable to change setting with name '%s' to '%s'" % (name, value)
 
+    def set_settings(self, settings):
+        """Sets several Gaia settings in a single settings transaction.
+
+        Returns a dictionary of the settings that could not be changed, mapped to the reported error.
+        """
+        return self.marionette.execute_async_script(
+            'return GaiaDataLayer.setSettings(%s)' % json.dumps(settings), special_powers=True)
+
     def _get_pref(self, datatype, name):
         self.marionette.switch_to_frame()
         pref = self.marionette.execute_script("return SpecialPowers.get%sPref('%s');" % (datatype, name), special_powers=True)
@@ -212,6 +621,23 @@ class GaiaData(object):
         self.marionette.switch_to_frame()
         self.marionette.execute_script("SpecialPowers.set%sPref('%s', %s);" % (datatype, name, value), special_powers=True)
 
+    def _pref_datatype(self, value):
+        if type(value) is int:
+            return 'Int'
+        elif type(value) is bool:
+            return 'Bool'
+        return 'Char'
+
+    def set_prefs(self, prefs):
+        """Sets several Gecko prefs in a single script, choosing the pref type from each value.
+
+        Returns a dictionary of the prefs that could not be changed, mapped to the reported error.
+        """
+        prefs = dict((name, [self._pref_datatype(value), value]) for name, value in prefs.items())
+        self.marionette.switch_to_frame()
+        return self.marionette.execute_script(
+            'return GaiaDataLayer.setPrefs(%s)' % json.dumps(prefs), special_powers=True)
+
     def get_bool_pref(self, name):
         """Returns the value of a Gecko boolean pref, which is different from a Gaia setting."""
         return self._get_pref('Bool', name)
@@ -238,8 +664,8 @@ class GaiaData(object):
 
     def set_volume(self, value):
         channels = ['alarm', 'content', 'notification']
-        for channel in channels:
-            self.set_setting('audio.volume.%s' % channel, value)
+        failures = self.set_settings(dict(('audio.volume.%s' % channel, value) for channel in channels))
+        assert not failures, 'Unable to change volume settings: %s' % failures
 
     def bluetooth_enable(self):
         self.marionette.switch_to_frame()
@@ -413,7 +839,7 @@ class Accessibility(object):
         self.marionette = marionette
         js = os.path.abspath(os.path.join(__file__, os.path.pardir,
                                           'atoms', "accessibility.js"))
-        self.marionette.import_script(js)
+        AtomCache.import_script(self.marionette, js)
 
     def is_hidden(self, element):
         return self._run_async_script('isHidden', [element])
@@ -464,13 +890,17 @@ class FakeUpdateChecker(object):
 
     def check_updates(self):
         self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        self.marionette.import_script(self.fakeupdatechecker_atom)
+        AtomCache.import_script(self.marionette, self.fakeupdatechecker_atom,
+                                self.marionette.CONTEXT_CHROME)
         self.marionette.execute_script("GaiaUITests_FakeUpdateChecker();")
         self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
 
 
 class GaiaDevice(object):
 
+    # {(host, port): [path]} of the storage paths found on each device
+    _storage_paths = {}
+
     def __init__(self, marionette, testvars=None, manager=None):
         self.manager = manager
         self.marionette = marionette
@@ -489,6 +919,9 @@ class GaiaDevice(object):
         self.lockscreen_atom = os.path.abspath(
             os.path.join(__file__, os.path.pardir, 'atoms', "gaia_lock_screen.js"))
 
+        # how long each phase of the last restart took, in seconds
+        self.restart_durations = {}
+
     def _set_storage_path(self):
         if self.is_desktop_b2g:
             # Override the storage location for desktop B2G. This will only
@@ -496,6 +929,28 @@ class GaiaDevice(object):
             GaiaData(self.marionette).set_char_pref(
                 'device.storage.overrideRootDir', self.storage_path)
 
+    @property
+    def storage_paths(self):
+        """The storage paths that exist on the device.
+
+        They are only looked for once per device, as GaiaDevice is created
+        for every test. Desktop B2G has a new storage path each time.
+        """
+        if self.is_desktop_b2g:
+            return [self.storage_path]
+        key = self.marionette.host, self.marionette.port
+        if key not in GaiaDevice._storage_paths:
+            storage_paths = [self.storage_path]
+            if self.is_android_build:
+                # TODO: Remove hard-coded paths once bug 1018079 is resolved
+                storage_paths.extend(['/mnt/sdcard',
+                                      '/mnt/extsdcard',
+                                      '/storage/sdcard',
+                                      '/storage/sdcard0',
+                                      '/storage/sdcard1'])
+            GaiaDevice._storage_paths[key] = self.file_manager.existing_dirs(storage_paths)
+        return GaiaDevice._storage_paths[key]
+
     @property
     def is_android_build(self):
         if self.testvars.get('is_android_build') is None:
@@ -535,11 +990,13 @@ class GaiaDevice(object):
         return self._has_wifi
 
     def restart_b2g(self):
+        # stop_b2g returns once the process has exited, so there is no need
+        # to wait before starting it again
         self.stop_b2g()
-        time.sleep(2)
         self.start_b2g()
 
     def start_b2g(self, timeout=60):
+        start = time.time()
         if self.marionette.instance:
             # launch the gecko instance attached to marionette
             self.marionette.instance.start()
@@ -547,14 +1004,68 @@ class GaiaDevice(object):
             self.manager.shellCheckOutput(['start', 'b2g'])
         else:
             raise Exception('Unable to start B2G')
+        self.restart_durations['start'] = time.time() - start
+
+        start = time.time()
         self.marionette.wait_for_port()
+        AtomCache.invalidate()
         self.marionette.start_session()
+        self.restart_durations['port'] = time.time() - start
 
+        start = time.time()
         self.wait_for_b2g_ready(timeout)
+        self.restart_durations['homescreen'] = time.time() - start
 
         # Reset the storage path for desktop B2G
         self._set_storage_path()
 
+    def quit_b2g(self, timeout=30):
+        """Ask desktop B2G to quit, so that it flushes its databases to disk,
+        and wait for it to exit. It is killed if it does not exit in time."""
+        runner = self.marionette.instance.runner
+        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
+        # quit once the script has returned, so that Marionette gets a response
+        self.marionette.execute_script("""
+          var appStartup = Components.classes['@mozilla.org/toolkit/app-startup;1']
+                                     .getService(Components.interfaces.nsIAppStartup);
+          window.setTimeout(function() {
+            appStartup.quit(appStartup.eAttemptQuit);
+          }, 0);
+        """)
+        if runner.wait(timeout) is None:
+            runner.stop()
+        self.stop_b2g()
+
+    def snapshot_profile(self):
+        """Copy the desktop B2G profile and storage, and start B2G from the copy from now on.
+
+        B2G is left stopped, for restore_profile to start it from the copy.
+        Returns the directory holding the snapshot.
+        """
+        instance = self.marionette.instance
+        snapshot = tempfile.mkdtemp()
+        self.quit_b2g()
+        shutil.copytree(instance.runner.profile.profile, os.path.join(snapshot, 'profile'))
+        shutil.copytree(self.storage_path, os.path.join(snapshot, 'storage'))
+        # the instance clones this profile every time it starts
+        instance.profile_path = os.path.join(snapshot, 'profile')
+        return snapshot
+
+    def restore_profile(self, snapshot):
+        """Restart desktop B2G from a snapshot taken by snapshot_profile."""
+        if self.marionette.session is not None:
+            self.stop_b2g()
+        start = time.time()
+        storage = os.path.join(snapshot, 'storage')
+        for item in os.listdir(storage):
+            source = os.path.join(storage, item)
+            if os.path.isdir(source):
+                shutil.copytree(source, os.path.join(self.storage_path, item))
+            else:
+                shutil.copy(source, self.storage_path)
+        self.restart_durations['wipe'] = time.time() - start
+        self.start_b2g()
+
     def wait_for_b2g_ready(self, timeout):
         # Wait for the homescreen to finish loading
         Wait(self.marionette, timeout).until(expected.element_present(
@@ -564,20 +1075,35 @@ class GaiaDevice(object):
     def is_b2g_running(self):
         return 'b2g' in self.manager.shellCheckOutput(['toolbox', 'ps'])
 
+    @property
+    def b2g_pids(self):
+        # the PID is the second column, and the command the last
+        return [line.split()[1] for line in self.manager.shellCheckOutput(['toolbox', 'ps']).splitlines()[1:]
+                if line.split() and line.split()[-1].rpartition('/')[-1] == 'b2g']
+
     def stop_b2g(self, timeout=5):
+        start = time.time()
         if self.marionette.instance:
             # close the gecko instance attached to marionette
             self.marionette.instance.close()
         elif self.is_android_build:
-            self.manager.shellCheckOutput(['stop', 'b2g'])
-            Wait(self.marionette, timeout=timeout).until(
-                lambda m: not self.is_b2g_running,
-                message='b2g failed to stop.')
+            # Stop b2g and wait for its processes to exit in the same shell,
+            # rather than listing the processes over adb until it has gone.
+            # usleep is not in every toolbox, so fall back to whole seconds.
+            pids = ' '.join(self.b2g_pids)
+            script = ('stop b2g; end=$(($(date +%%s) + %d)); '
+                      'for pid in %s; do while [ -d /proc/$pid ]; do '
+                      'if [ $(date +%%s) -ge $end ]; then echo running; exit 0; fi; '
+                      'usleep 50000 2>/dev/null || sleep 1; done; done' % (timeout, pids))
+            if self.manager.shellCheckOutput(['sh', '-c', script]).strip() == 'running':
+                raise Exception('b2g failed to stop.')
         else:
             raise Exception('Unable to stop B2G')
+        self.restart_durations['stop'] = time.time() - start
         self.marionette.client.close()
         self.marionette.session = None
         self.marionette.window = None
+        AtomCache.invalidate()
 
     def press_sleep_button(self):
         self.marionette.execute_script("""
@@ -653,14 +1179,14 @@ class GaiaDevice(object):
         return self.marionette.execute_script('return window.wrappedJSObject.lockScreen.locked')
 
     def lock(self):
-        self.marionette.import_script(self.lockscreen_atom)
+        AtomCache.import_script(self.marionette, self.lockscreen_atom)
         self.marionette.switch_to_frame()
         result = self.marionette.execute_async_script('GaiaLockScreen.lock()')
         assert result, 'Unable to lock screen'
         Wait(self.marionette).until(lambda m: m.find_element(By.CSS_SELECTOR, 'div.lockScreenWindow.active'))
 
     def unlock(self):
-        self.marionette.import_script(self.lockscreen_atom)
+        AtomCache.import_script(self.marionette, self.lockscreen_atom)
         self.marionette.switch_to_frame()
         result = self.marionette.execute_async_script('GaiaLockScreen.unlock()')
         assert result, 'Unable to unlock screen'
@@ -700,14 +1226,75 @@ class GaiaDevice(object):
         return self.marionette.execute_script('return window.screen.mozOrientation')
 
 class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
+
+    # state captured after the first full cleanup when running with --cleanup=diff
+    _cleanup_baseline = None
+
+    # directory of the profile captured after the first full cleanup when
+    # running with --reset-from-snapshot
+    _profile_snapshot = None
+
     def __init__(self, *args, **kwargs):
         self.restart = kwargs.pop('restart', False)
+        self.cleanup = kwargs.pop('cleanup', 'full')
+        self.reuse_session = kwargs.pop('reuse_session', False)
+        self.reset_from_snapshot = kwargs.pop('reset_from_snapshot', False)
+        self.profile_wire = kwargs.pop('profile_wire', None)
         MarionetteTestCase.__init__(self, *args, **kwargs)
         B2GTestCaseMixin.__init__(self, *args, **kwargs)
+        self.phase_durations = {}
+        self.timer = PhaseTimer()
+
+    def run(self, result=None):
+        # time the setUp, test and tearDown phases separately, along with the
+        # phases within them
+        self.timer = PhaseTimer(get_default_logger())
+        PhaseTimer.current = self.timer
+        self._phase_start = time.time()
+        test_method = getattr(self, self._testMethodName)
+
+        @functools.wraps(test_method)
+        def timed_test_method(*args, **kwargs):
+            __tracebackhide__ = True
+            self.phase_durations['setUp'] = time.time() - self._phase_start
+            self._phase_start = time.time()
+            try:
+                with self.timer.phase('test'):
+                    return test_method(*args, **kwargs)
+            finally:
+                self.phase_durations['test'] = time.time() - self._phase_start
+                self._phase_start = time.time()
+
+        setattr(self, self._testMethodName, timed_test_method)
+        self.setUp = PhaseTimer.timed('setUp')(self.setUp)
+        self.tearDown = PhaseTimer.timed('tearDown')(self.tearDown)
+        if self.profile_wire:
+            self.wire_profiler = WireProfiler(self._marionette_weakref())
+            self.wire_profiler.start()
+        try:
+            return MarionetteTestCase.run(self, result)
+        finally:
+            delattr(self, self._testMethodName)
+            del self.setUp
+            del self.tearDown
+            PhaseTimer.current = None
+            if self.profile_wire:
+                self.wire_profiler.stop()
+                self.write_wire_profile()
+
+    def write_wire_profile(self):
+        if not os.path.exists(self.profile_wire):
+            os.makedirs(self.profile_wire)
+        path = os.path.join(self.profile_wire, '%s.folded' % self.id())
+        self.wire_profiler.write_collapsed(path)
+        get_default_logger().info('Marionette commands sent by %s, written to %s:\n%s' % (
+            self.id(), path, self.wire_profiler.report()))
 
     def setUp(self):
         try:
-            MarionetteTestCase.setUp(self)
+            with self.timer.phase('MarionetteTestCase.setUp'):
+                FrameTracker.install(self._marionette_weakref())
+                MarionetteTestCase.setUp(self)
         except (InvalidResponseException, IOError):
             if self.restart:
                 pass
@@ -720,13 +1307,43 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
             # Restart if it's a device, or we have passed a binary instance with --binary command arg
             self.device.stop_b2g()
             if self.device.is_android_build:
+                start = time.time()
                 self.cleanup_data()
+                self.device.restart_durations['wipe'] = time.time() - start
             self.device.start_b2g()
+        elif self.use_profile_snapshot:
+            if GaiaTestCase._profile_snapshot is None:
+                GaiaTestCase._profile_snapshot = self.take_profile_snapshot()
+            self.device.restore_profile(GaiaTestCase._profile_snapshot)
+        # reported with the test's other phase durations
+        self.phase_durations.update(
+            ('restart.%s' % phase, duration) for phase, duration in self.device.restart_durations.items())
 
         # Run the fake update checker
-        FakeUpdateChecker(self.marionette).check_updates()
+        with self.timer.phase('FakeUpdateChecker'):
+            FakeUpdateChecker(self.marionette).check_updates()
 
         # We need to set the default timeouts because we may have a new session
+        with self.timer.phase('timeouts'):
+            self.set_timeouts()
+
+        self.apps = GaiaApps(self.marionette)
+        self.data_layer = GaiaData(self.marionette, self.testvars)
+        self.accessibility = Accessibility(self.marionette)
+
+        if self.restart:
+            self.cleanup_storage()
+            self.cleanup_gaia(full_reset=False)
+        elif self.use_profile_snapshot:
+            # B2G was started from the snapshot, which is already clean
+            pass
+        elif self.cleanup == 'diff':
+            self.cleanup_gaia_diff()
+        else:
+            self.cleanup_storage()
+            self.cleanup_gaia(full_reset=True)
+
+    def set_timeouts(self):
         if self.marionette.timeout is None:
             # if no timeout is passed in, we detect the hardware type and set reasonable defaults
             timeouts = {}
@@ -756,91 +1373,97 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
             self.marionette.timeouts(self.marionette.TIMEOUT_SCRIPT, self.marionette.timeout)
             self.marionette.timeouts(self.marionette.TIMEOUT_PAGE, self.marionette.timeout)
 
+    def take_profile_snapshot(self):
+        """Fully reset Gaia and snapshot the profile every test starts from."""
+        self.set_timeouts()
         self.apps = GaiaApps(self.marionette)
         self.data_layer = GaiaData(self.marionette, self.testvars)
-        self.accessibility = Accessibility(self.marionette)
-
         self.cleanup_storage()
+        self.cleanup_gaia(full_reset=True)
+        return self.device.snapshot_profile()
 
-        if self.restart:
-            self.cleanup_gaia(full_reset=False)
-        else:
-            self.cleanup_gaia(full_reset=True)
+    @property
+    def use_profile_snapshot(self):
+        # profiles can only be copied when B2G runs locally from --binary
+        return self.reset_from_snapshot and self.marionette.instance and self.device.is_desktop_b2g
 
+    @PhaseTimer.timed('cleanup_data')
     def cleanup_data(self):
-        self.device.file_manager.remove('/cache/*')
-        self.device.file_manager.remove('/data/b2g/mozilla')
-        self.device.file_manager.remove('/data/local/debug_info_trigger')
-        self.device.file_manager.remove('/data/local/indexedDB')
-        self.device.file_manager.remove('/data/local/OfflineCache')
-        self.device.file_manager.remove('/data/local/permissions.sqlite')
-        self.device.file_manager.remove('/data/local/storage/persistent')
-        # remove remembered networks
-        self.device.file_manager.remove('/data/misc/wifi/wpa_supplicant.conf')
+        self.device.file_manager.remove_all([
+            '/cache/*',
+            '/data/b2g/mozilla',
+            '/data/local/debug_info_trigger',
+            '/data/local/indexedDB',
+            '/data/local/OfflineCache',
+            '/data/local/permissions.sqlite',
+            '/data/local/storage/persistent',
+            # remove remembered networks
+            '/data/misc/wifi/wpa_supplicant.conf'])
+
+    @property
+    def storage_paths(self):
+        return self.device.storage_paths
 
+    @PhaseTimer.timed('cleanup_storage')
     def cleanup_storage(self):
         """Remove all files from the device's storage paths"""
-        storage_paths = [self.device.storage_path]
-        if self.device.is_android_build:
-            # TODO: Remove hard-coded paths once bug 1018079 is resolved
-            storage_paths.extend(['/mnt/sdcard',
-                                  '/mnt/extsdcard',
-                                  '/storage/sdcard',
-                                  '/storage/sdcard0',
-                                  '/storage/sdcard1'])
-        for path in storage_paths:
-            if self.device.file_manager.dir_exists(path):
-                for item in self.device.file_manager.list_items(path):
-                    self.device.file_manager.remove('/'.join([path, item]))
+        return self.device.file_manager.clear_dirs(self.storage_paths)
 
+    @PhaseTimer.timed('cleanup_gaia')
     def cleanup_gaia(self, full_reset=True):
-        # restore settings from testvars
-        [self.data_layer.set_setting(name, value) for name, value in self.testvars.get('settings', {}).items()]
-
-        # restore prefs from testvars
-        for name, value in self.testvars.get('prefs', {}).items():
-            if type(value) is int:
-                self.data_layer.set_int_pref(name, value)
-            elif type(value) is bool:
-                self.data_layer.set_bool_pref(name, value)
-            else:
-                self.data_layer.set_char_pref(name, value)
+        # restore settings from testvars, then apply our own defaults on top
+        settings = dict(self.testvars.get('settings', {}))
 
-        # unlock
-        if self.data_layer.get_setting('lockscreen.enabled'):
-            self.device.unlock()
+        # disable sound completely
+        settings.update(('audio.volume.%s' % channel, 0) for channel in ['alarm', 'content', 'notification'])
 
-        # kill the FTU and any open, user-killable apps
-        self.apps.kill_all()
+        # disable auto-correction of keyboard
+        settings['keyboard.autocorrect'] = False
 
         if full_reset:
             # disable passcode
-            self.data_layer.set_setting('lockscreen.passcode-lock.code', '1111')
-            self.data_layer.set_setting('lockscreen.passcode-lock.enabled', False)
+            settings['lockscreen.passcode-lock.code'] = '1111'
+            settings['lockscreen.passcode-lock.enabled'] = False
 
             # change language back to english
-            self.data_layer.set_setting("language.current", "en-US")
+            settings['language.current'] = 'en-US'
 
             # reset keyboard to default values
-            self.data_layer.set_setting("keyboard.enabled-layouts",
-                                        "{'app://keyboard.gaiamobile.org/manifest.webapp': {'en': True, 'number': True}}")
+            settings['keyboard.enabled-layouts'] = \
+                "{'app://keyboard.gaiamobile.org/manifest.webapp': {'en': True, 'number': True}}"
 
             # reset do not track
-            self.data_layer.set_setting('privacy.donottrackheader.value', '-1')
+            settings['privacy.donottrackheader.value'] = '-1'
+
+            # Re-set edge gestures pref to False
+            settings['edgesgesture.enabled'] = False
+
+            # disable cell roaming
+            settings['ril.data.roaming_enabled'] = False
+
+        failures = self.data_layer.set_settings(settings)
+        assert not failures, 'Unable to restore settings: %s' % failures
 
+        # restore prefs from testvars
+        failures = self.data_layer.set_prefs(self.testvars.get('prefs', {}))
+        assert not failures, 'Unable to restore prefs: %s' % failures
+
+        # unlock
+        if self.data_layer.get_setting('lockscreen.enabled'):
+            self.device.unlock()
+
+        # kill the FTU and any open, user-killable apps
+        self.apps.kill_all()
+
+        if full_reset:
             if self.data_layer.get_setting('airplaneMode.enabled'):
                 # enable the device radio, disable airplane mode
                 self.data_layer.set_setting('airplaneMode.enabled', False)
 
-            # Re-set edge gestures pref to False
-            self.data_layer.set_setting('edgesgesture.enabled', False)
-
             # disable carrier data connection
             if self.device.has_mobile_connection:
                 self.data_layer.disable_cell_data()
 
-            self.data_layer.disable_cell_roaming()
-
             if self.device.has_wifi:
                 # Bug 908553 - B2G Emulator: support wifi emulation
                 if not self.device.is_emulator:
@@ -854,11 +1477,82 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
             # reset to home screen
             self.device.touch_home_button()
 
-        # disable sound completely
-        self.data_layer.set_volume(0)
+    def snapshot_state(self):
+        """Returns the parts of the target's state that are restored between tests"""
+        state = {
+            'settings': self.data_layer.all_settings,
+            'contacts': self.data_layer.contact_count,
+            'known_networks': 0,
+            'running_apps': sorted(app.origin for app in self.apps.running_apps(include_system_apps=True)),
+            'storage': {}}
+        if self.device.has_wifi and not self.device.is_emulator:
+            state['known_networks'] = len(self.data_layer.known_networks)
+        for path in self.storage_paths:
+            state['storage'][path] = sorted(self.device.file_manager.list_items(path))
+        return state
+
+    @PhaseTimer.timed('cleanup_gaia_diff')
+    def cleanup_gaia_diff(self):
+        """Restore only the state that changed since the baseline was captured.
+
+        The first test of the session does a full cleanup and captures the
+        resulting state as the baseline for all following tests.
+        """
+        baseline = GaiaTestCase._cleanup_baseline
+        if baseline is None:
+            self.cleanup_storage()
+            self.cleanup_gaia(full_reset=True)
+            GaiaTestCase._cleanup_baseline = self.snapshot_state()
+            return
 
-        # disable auto-correction of keyboard
-        self.data_layer.set_setting('keyboard.autocorrect', False)
+        state = self.snapshot_state()
+
+        # remove files that were not there when the baseline was captured
+        self.device.file_manager.remove_paths(sorted(
+            '/'.join([path, item]) for path, items in state['storage'].items()
+            for item in set(items) - set(baseline['storage'].get(path, []))))
+
+        # restore changed settings, leaving the ones with side effects to the data layer
+        settings = dict((name, value) for name, value in baseline['settings'].items()
+                        if state['settings'].get(name) != value)
+        restore_cell_data = settings.pop('ril.data.enabled', None) is not None
+        restore_wifi = settings.pop('wifi.enabled', None) is not None
+        failures = self.data_layer.set_settings(settings)
+        assert not failures, 'Unable to restore settings: %s' % failures
+
+        # restore prefs from testvars, in one script as cleanup_gaia does
+        failures = self.data_layer.set_prefs(self.testvars.get('prefs', {}))
+        assert not failures, 'Unable to restore prefs: %s' % failures
+
+        # unlock
+        if baseline['settings'].get('lockscreen.enabled'):
+            self.device.unlock()
+
+        if restore_cell_data and self.device.has_mobile_connection:
+            if baseline['settings'].get('ril.data.enabled'):
+                self.data_layer.connect_to_cell_data()
+            else:
+                self.data_layer.disable_cell_data()
+
+        # Bug 908553 - B2G Emulator: support wifi emulation
+        if self.device.has_wifi and not self.device.is_emulator:
+            if state['known_networks'] != baseline['known_networks']:
+                self.data_layer.enable_wifi()
+                self.data_layer.forget_all_networks()
+                restore_wifi = True
+            if restore_wifi:
+                if baseline['settings'].get('wifi.enabled'):
+                    self.data_layer.enable_wifi()
+                else:
+                    self.data_layer.disable_wifi()
+
+        if state['contacts'] != baseline['contacts']:
+            self.data_layer.remove_all_contacts()
+
+        if state['running_apps'] != baseline['running_apps']:
+            # kill the FTU and any open, user-killable apps
+            self.apps.kill_all()
+            self.device.touch_home_button()
 
     def connect_to_network(self):
         if not self.device.is_online:
@@ -880,19 +1574,33 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
             else:
                 raise Exception('Unable to connect to local area network')
 
-    def push_resource(self, filename, remote_path=None, count=1):
-        # push to the test storage space defined by device root
+    def push_resource(self, filename, remote_path=None, count=1, link=False):
+        # push to the test storage space defined by device root, linking
+        # duplicates where possible if the test will not modify them
         self.device.file_manager.push_file(
-            self.resource(filename), remote_path, count)
+            self.resource(filename), remote_path, count, link)
+
+    def push_resources(self, filenames, remote_path=None, count=1, link=False):
+        # push several resources concurrently, taking about as long as the
+        # slowest of them rather than the sum
+        with GaiaAsyncFileManager(self.device.file_manager) as file_manager:
+            for filename in filenames:
+                file_manager.push_file(self.resource(filename), remote_path, count, link)
 
     def resource(self, filename):
         return os.path.abspath(os.path.join(os.path.dirname(__file__), 'resources', filename))
 
+    @property
+    def element_wait(self):
+        return ElementWait(self.marionette)
+
     def wait_for_element_present(self, by, locator, timeout=None):
+        timeout = self.element_wait.until(by, locator, 'present', timeout)
         return Wait(self.marionette, timeout, ignored_exceptions=NoSuchElementException).until(
             lambda m: m.find_element(by, locator))
 
     def wait_for_element_not_present(self, by, locator, timeout=None):
+        timeout = self.element_wait.until(by, locator, 'not present', timeout)
         self.marionette.set_search_timeout(0)
         try:
             return Wait(self.marionette, timeout).until(
@@ -902,10 +1610,12 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
         self.marionette.set_search_timeout(self.marionette.timeout or 10000)
 
     def wait_for_element_displayed(self, by, locator, timeout=None):
+        timeout = self.element_wait.until(by, locator, 'displayed', timeout)
         Wait(self.marionette, timeout, ignored_exceptions=[NoSuchElementException, StaleElementException]).until(
             lambda m: m.find_element(by, locator).is_displayed())
 
     def wait_for_element_not_displayed(self, by, locator, timeout=None):
+        timeout = self.element_wait.until(by, locator, 'not displayed', timeout)
         self.marionette.set_search_timeout(0)
         try:
             Wait(self.marionette, timeout, ignored_exceptions=StaleElementException).until(
@@ -918,6 +1628,9 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
         Wait(self.marionette, timeout).until(method, message=message)
 
     def is_element_present(self, by, locator):
+        present = self.element_wait.is_present(by, locator)
+        if present is not None:
+            return present
         self.marionette.set_search_timeout(0)
         try:
             self.marionette.find_element(by, locator)
@@ -942,16 +1655,115 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
         self.apps = None
         self.data_layer = None
         MarionetteTestCase.tearDown(self)
+        self.phase_durations['tearDown'] = time.time() - self._phase_start
+
+    def cleanTest(self):
+        if self.reuse_session and self.marionette.session is not None:
+            # keep the session, and the atoms imported into it, for the next test
+            try:
+                self.loglines.extend(self.marionette.get_logs())
+                self.marionette.switch_to_frame()
+                self.duration = time.time() - self.start_time
+                self.marionette = None
+                return
+            except (socket.error, MarionetteException, IOError):
+                pass
+        MarionetteTestCase.cleanTest(self)
+        AtomCache.invalidate()
 
 
 class GaiaEnduranceTestCase(GaiaTestCase, EnduranceTestCaseMixin, MemoryEnduranceTestCaseMixin):
 
     def __init__(self, *args, **kwargs):
+        self.memory_sample_interval = kwargs.pop('memory_sample_interval', None)
         GaiaTestCase.__init__(self, *args, **kwargs)
         EnduranceTestCaseMixin.__init__(self, *args, **kwargs)
         MemoryEnduranceTestCaseMixin.__init__(self, *args, **kwargs)
         kwargs.pop('iterations', None)
         kwargs.pop('checkpoint_interval', None)
+        self.memory_sampler = None
+        if self.memory_sample_interval:
+            self.add_drive_setup_function(self.start_memory_sampler)
+        self.run_results = None
+        self.paused = 0
+        self.add_drive_setup_function(self.start_results)
+        self.add_pre_test_function(self.start_iteration)
+        self.add_post_test_function(self.end_iteration)
+        self.add_checkpoint_function(self.results_checkpoint)
+        self.add_process_checkpoint_function(self.write_results)
+
+    def start_results(self, test, app):
+        self.run_results = EnduranceRun(
+            test.__name__, app and app.lower(), self.iterations, self.checkpoint_interval)
+
+    def pause(self, seconds):
+        """Sleep between the actions of an iteration, without counting the
+        pause towards how long the iteration took."""
+        start = time.time()
+        time.sleep(seconds)
+        self.paused += time.time() - start
+
+    def start_iteration(self):
+        self.paused = 0
+        self.iteration_start = time.time()
+
+    def end_iteration(self):
+        self.run_results.iteration_durations.append(
+            time.time() - self.iteration_start - self.paused)
+
+    def results_checkpoint(self):
+        if not self.device_manager:
+            return
+        # the b2g rss is read from the b2g-ps output just added to the
+        # checkpoint log, as the memory endurance mixin summarizes it
+        with open(self.log_name) as log_file:
+            b2g_rss = [int(line.split()[5]) for line in log_file if line.startswith('b2g')]
+        # app processes are named after the app, truncated like any process name
+        origins = dict((app.name[:15], app.origin)
+                       for app in self.apps.running_apps(include_system_apps=True))
+        # the system app runs in the main b2g process
+        origins['b2g'] = 'app://system.gaiamobile.org'
+        processes = parse_procrank(self.device_manager.shellCheckOutput(['b2g-procrank']))
+        self.run_results.add_checkpoint(
+            self.iteration, b2g_rss and b2g_rss[-1] or None,
+            dict((origins.get(name, name), int(values['rss'] * 1024))
+                 for name, values in processes.items()),
+            time.time())
+
+    def write_results(self):
+        if self.memory_sampler:
+            self.memory_sampler.stop()
+            self.run_results.memory_samples = self.memory_sampler.columns()
+            self.run_results.memory_summary = self.memory_sampler.summary()
+            self.memory_sampler = None
+        self.run_results.completed = time.time()
+        self.run_results.device = dict(
+            (name[len('deviceinfo.'):], value)
+            for name, value in self.data_layer.all_settings.items()
+            if name.startswith('deviceinfo.'))
+        # written next to the checkpoint log and its summary
+        self.run_results.write(self.log_name.replace('.log', RESULTS_SUFFIX))
+        if os.path.exists(self.log_name.replace('.log', '_summary.log')):
+            with open(self.log_name.replace('.log', '_summary.log'), 'a') as summary_file:
+                for key, value in sorted(self.run_results.iteration_summary().items()):
+                    if isinstance(value, float):
+                        value = round(value, 3)
+                    summary_file.write('iteration_%s: %s\n' % (key, value))
+
+    def start_memory_sampler(self, test, app):
+        if not self.device_manager:
+            return
+        self.memory_sampler = MemorySampler(
+            self.device_manager, self.memory_sample_interval,
+            lambda: getattr(self, 'iteration', 0))
+        self.memory_sampler.start()
+
+    def tearDown(self):
+        if self.memory_sampler:
+            # the test failed before its checkpoint data was processed
+            self.memory_sampler.stop()
+            self.memory_sampler = None
+        GaiaTestCase.tearDown(self)
 
     def close_app(self):
         # Close the current app (self.app) by using the home button
@@ -963,7 +1775,7 @@ class GaiaEnduranceTestCase(GaiaTestCase, EnduranceTestCaseMixin, MemoryEnduranc
         self.wait_for_element_displayed(*_cards_view_locator)
 
         # Sleep a bit
-        time.sleep(5)
+        self.pause(5)
 
         # Tap the close icon for the current app
         locator_part_two = '#cards-view li.card[data-origin*="%s"] .close-card' % self.app_under_test.lower()
@@ -0,0 +1,92 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import json
+import math
+
+from duration_store import median
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank percentile of the values."""
+    values = sorted(values)
+    if not values:
+        return None
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+
+def stddev(values):
+    """Returns the sample standard deviation of the values."""
+    if len(values) < 2:
+        return None
+    mean = float(sum(values)) / len(values)
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+
+
+def summarize(samples):
+    return {'samples': samples,
+            'median': median(samples),
+            'p95': percentile(samples, 95),
+            'stddev': stddev(samples)}
+
+
+class LaunchBenchmark(object):
+    """Measures how long apps take to launch, cold and warm.
+
+    A cold launch starts the app after all apps are killed, and a warm launch
+    brings it back from the background after returning to the homescreen.
+    The first launches of each kind are discarded as warm-up.
+    """
+
+    def __init__(self, apps, device, iterations=10, warmup=1):
+        self.apps = apps
+        self.device = device
+        self.iterations = iterations
+        self.warmup = warmup
+
+    def measure_cold(self, name):
+        samples = []
+        for i in range(self.warmup + self.iterations):
+            self.apps.kill_all()
+            samples.append(self.apps.measure_launch(name))
+        return samples[self.warmup:]
+
+    def measure_warm(self, name):
+        samples = []
+        self.apps.launch(name)
+        for i in range(self.warmup + self.iterations):
+            self.device.touch_home_button()
+            samples.append(self.apps.measure_launch(name))
+        return samples[self.warmup:]
+
+    def run(self, names):
+        """Measure each app, and return the summary of its launch times.
+
+        An app that fails to launch is reported with its error, and does not
+        stop the others being measured.
+        """
+        results = {}
+        for name in names:
+            try:
+                cold = self.measure_cold(name)
+                warm = self.measure_warm(name)
+            except Exception as e:
+                results[name] = {'error': str(e)}
+                continue
+            finally:
+                self.apps.kill_all()
+            results[name] = {
+                'cold': {'open': summarize([s['open'] for s in cold]),
+                         'load': summarize([s['load'] for s in cold if s['load'] is not None])},
+                'warm': {'open': summarize([s['open'] for s in warm])}}
+        return results
+
+    def write(self, path, results, build=None):
+        """Write the results as JSON, along with the build they were measured on."""
+        with open(path, 'w') as f:
+            json.dump({'build': build or {},
+                       'iterations': self.iterations,
+                       'warmup': self.warmup,
+                       'apps': results}, f, indent=2, sort_keys=True)
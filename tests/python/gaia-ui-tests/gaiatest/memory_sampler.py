@@ -0,0 +1,159 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from array import array
+import subprocess
+import threading
+import time
+
+
+def slope(xs, ys):
+    """Returns the least squares slope of ys against xs."""
+    n = len(xs)
+    if n < 2:
+        return None
+    mean_x = float(sum(xs)) / n
+    mean_y = float(sum(ys)) / n
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def parse_procrank_line(columns, fields):
+    """Returns the process name and memory use from a line of b2g-procrank
+    output, given the columns of its header, or None if it is not a process."""
+    # names can contain spaces, so read the other columns from the right
+    name_fields = len(fields) - len(columns) + 1
+    values = dict(zip(columns[1:], fields[name_fields:]))
+    try:
+        return ' '.join(fields[:name_fields]), dict(
+            (metric, float(values[metric.upper()])) for metric in MemorySeries.metrics)
+    except (KeyError, ValueError):
+        # totals and separators
+        return None
+
+
+def parse_procrank(output):
+    """Returns {process name: {metric: MB}} from the output of b2g-procrank."""
+    columns = None
+    processes = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if fields and fields[0] == 'NAME':
+            columns = fields
+        elif fields and columns:
+            process = parse_procrank_line(columns, fields)
+            if process:
+                processes[process[0]] = process[1]
+    return processes
+
+
+class MemorySeries(object):
+    """Memory use of one process over time, stored in compact arrays."""
+
+    metrics = ('uss', 'pss', 'rss')
+
+    def __init__(self):
+        self.times = array('d')
+        self.iterations = array('i')
+        self.values = dict((metric, array('d')) for metric in self.metrics)
+
+    def append(self, timestamp, iteration, values):
+        self.times.append(timestamp)
+        self.iterations.append(iteration)
+        for metric in self.metrics:
+            self.values[metric].append(values[metric])
+
+    def __len__(self):
+        return len(self.times)
+
+    def summary(self):
+        """Returns the peak of each metric, the slope of the PSS in MB per
+        minute, and the PSS leaked per iteration, estimated from the slope of
+        the median PSS of each iteration."""
+        pss = self.values['pss']
+        per_iteration = {}
+        for iteration, value in zip(self.iterations, pss):
+            per_iteration.setdefault(iteration, []).append(value)
+        iterations = sorted(i for i in per_iteration if i > 0)
+        medians = [sorted(per_iteration[i])[len(per_iteration[i]) / 2] for i in iterations]
+        pss_slope = slope(self.times, pss)
+        summary = dict(('peak_%s' % metric, max(self.values[metric]))
+                       for metric in self.metrics)
+        summary.update({
+            'samples': len(self),
+            'pss_per_minute': pss_slope and pss_slope * 60,
+            'pss_per_iteration': slope(iterations, medians)})
+        return summary
+
+
+class MemorySampler(object):
+    """Samples the USS, PSS and RSS of b2g and each app process in the background.
+
+    A single long-lived adb shell runs b2g-procrank at the given interval, and
+    a thread reads its output. Samples are tagged with the iteration returned
+    by the iteration callable, and stored by process name, so an app that is
+    restarted keeps one series. Values are in MB, as reported by b2g-procrank.
+    """
+
+    def __init__(self, manager, interval=1, iteration=None):
+        self.manager = manager
+        self.interval = interval
+        self.iteration = iteration or (lambda: 0)
+        # {process name: MemorySeries}
+        self.series = {}
+        self._process = None
+        self._thread = None
+
+    def _command(self):
+        if self.interval == int(self.interval):
+            wait = 'sleep %d' % self.interval
+        else:
+            # usleep is not in every toolbox, so fall back to whole seconds.
+            wait = 'usleep %d 2>/dev/null || sleep 1' % (self.interval * 1000000)
+        command = [getattr(self.manager, '_adbPath', 'adb')]
+        if getattr(self.manager, '_deviceSerial', None):
+            command.extend(['-s', self.manager._deviceSerial])
+        return command + ['shell', 'while true; do echo @; b2g-procrank; %s; done' % wait]
+
+    def start(self):
+        self._process = subprocess.Popen(self._command(), stdout=subprocess.PIPE)
+        self._thread = threading.Thread(target=self._read)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._process:
+            self._process.terminate()
+            self._thread.join()
+            self._process = None
+
+    def _read(self):
+        columns = None
+        timestamp = None
+        for line in iter(self._process.stdout.readline, ''):
+            fields = line.split()
+            if not fields:
+                continue
+            if fields == ['@']:
+                timestamp = time.time()
+            elif fields[0] == 'NAME':
+                columns = fields
+            elif columns and timestamp:
+                process = parse_procrank_line(columns, fields)
+                if process:
+                    self.series.setdefault(process[0], MemorySeries()).append(
+                        timestamp, self.iteration(), process[1])
+
+    def summary(self):
+        return dict((name, series.summary()) for name, series in self.series.items())
+
+    def columns(self):
+        """Returns {process name: {'time': [...], 'iteration': [...], metric: [...]}}."""
+        columns = {}
+        for name, series in self.series.items():
+            columns[name] = dict((metric, list(values)) for metric, values in series.values.items())
+            columns[name].update(time=list(series.times), iteration=list(series.iterations))
+        return columns
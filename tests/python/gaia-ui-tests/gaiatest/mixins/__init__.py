@@ -5,3 +5,5 @@
 from gaia import *
 from treeherder import TreeherderOptionsMixin, \
     TreeherderTestRunnerMixin
+from sharding import ShardingOptionsMixin, ShardingTestRunnerMixin
+from durations import DurationsOptionsMixin, DurationsTestRunnerMixin
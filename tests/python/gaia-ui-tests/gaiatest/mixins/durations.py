@@ -0,0 +1,112 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import os
+
+import mozversion
+
+from gaiatest.duration_store import DurationStore
+
+
+class DurationsOptionsMixin(object):
+
+    def __init__(self, **kwargs):
+        group = self.add_option_group('durations')
+        group.add_option('--durations-db',
+                         action='store',
+                         dest='durations_db',
+                         help='SQLite database to record test durations to, and to read '
+                              'previous durations from when scheduling tests',
+                         metavar='PATH')
+        group.add_option('--schedule',
+                         action='store',
+                         dest='schedule',
+                         choices=['manifest', 'longest-first'],
+                         default='manifest',
+                         help='order to run tests in. "longest-first" uses the durations '
+                              'database to start the slowest tests first, and to balance '
+                              '--total-chunks by predicted time (all chunks must then use '
+                              'the same database). Default: %default')
+
+
+class DurationsTestRunnerMixin(object):
+
+    def __init__(self, durations_db=None, schedule='manifest', **kwargs):
+        self.durations_db = durations_db
+        self.schedule = schedule
+        # predicted duration in seconds of each test file
+        self.test_durations = {}
+        if self.durations_db:
+            self.mixin_run_tests.append(self.record_durations)
+
+    def load_durations(self):
+        if self.durations_db and not self.test_durations:
+            store = DurationStore(self.durations_db)
+            self.test_durations = store.file_durations(self.device)
+            store.close()
+
+    def predicted_duration(self, test, default=0):
+        return self.test_durations.get(os.path.basename(test['filepath']), default)
+
+    def default_duration(self, tests):
+        """Returns the duration assumed for tests without a known one: the
+        average of the known durations, or 1 if none are known, so that
+        unknown tests are still spread across chunks."""
+        known = [self.test_durations[f] for f in
+                 [os.path.basename(test['filepath']) for test in tests]
+                 if f in self.test_durations]
+        return known and float(sum(known)) / len(known) or 1
+
+    def prioritize_tests(self, tests):
+        """Order tests so that the longest known ones are started first.
+
+        Tests without a known duration are assumed to take the average time.
+        """
+        default = self.default_duration(tests)
+        return sorted(tests, key=lambda test: self.predicted_duration(test, default),
+                      reverse=True)
+
+    def balance_chunks(self, tests, total_chunks):
+        """Split tests into chunks of similar predicted duration.
+
+        Each test, longest first, goes to the chunk with the least predicted
+        time so far.
+        """
+        chunks = [[] for i in range(total_chunks)]
+        totals = [0] * total_chunks
+        default = self.default_duration(tests)
+        for test in self.prioritize_tests(tests):
+            shortest = totals.index(min(totals))
+            chunks[shortest].append(test)
+            totals[shortest] += self.predicted_duration(test, default)
+        return chunks
+
+    def record_durations(self, tests):
+        entries = []
+        for results in self.results:
+            for result in results:
+                if result.result == 'SKIPPED':
+                    continue
+                entry = {'test_id': '%s.%s' % (result.test_class, result.name),
+                         'filename': '%s.py' % result.test_class.split('.')[0],
+                         'result': result.result,
+                         'total': result.duration}
+                entry.update(getattr(result, 'phases', {}))
+                entries.append(entry)
+
+        try:
+            version = mozversion.get_version(
+                binary=self.bin, sources=self.sources,
+                dm_type=os.environ.get('DM_TRANS', 'adb'),
+                device_serial=self.device_serial)
+            revision = version.get('gaia_changeset')
+        except Exception as e:
+            self.logger.warning('Unable to determine Gaia revision: %s' % e)
+            revision = None
+
+        store = DurationStore(self.durations_db)
+        store.record(entries, self.device, revision)
+        store.close()
+        self.logger.info('Recorded %d test durations to %s' % (
+            len(entries), self.durations_db))
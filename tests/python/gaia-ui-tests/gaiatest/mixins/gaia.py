@@ -18,6 +18,40 @@ class GaiaOptionsMixin(object):
                          dest='restart',
                          default=False,
                          help='restart target instance between tests')
+        group.add_option('--cleanup',
+                         action='store',
+                         dest='cleanup',
+                         choices=['full', 'diff'],
+                         default='full',
+                         help='how to restore the target between tests: "full" resets '
+                              'everything, "diff" only undoes changes from a baseline '
+                              'captured before the first test. Default: %default')
+        group.add_option('--reuse-session',
+                         action='store_true',
+                         dest='reuse_session',
+                         default=False,
+                         help='keep the Marionette session between tests instead of '
+                              'starting a new one, so JS atoms are only imported once')
+        group.add_option('--reset-from-snapshot',
+                         action='store_true',
+                         dest='reset_from_snapshot',
+                         default=False,
+                         help='snapshot the desktop B2G profile after the first full '
+                              'cleanup, and restart from it before every other test')
+        group.add_option('--profile-wire',
+                         action='store',
+                         dest='profile_wire',
+                         metavar='DIR',
+                         help='count and time the Marionette commands sent by each test, '
+                              'by call site, and write them to DIR as collapsed stacks '
+                              'for flame graph tools')
+        group.add_option('--memory-sample-interval',
+                         action='store',
+                         type='float',
+                         dest='memory_sample_interval',
+                         metavar='SECONDS',
+                         help='sample the memory use of b2g and each app process in the '
+                              'background of endurance tests, every SECONDS')
 
 
 class GaiaTestRunnerMixin(object):
@@ -54,4 +88,20 @@ class GaiaTestRunnerMixin(object):
                 print '\nTest run aborted by user.'
                 sys.exit(1)
             print 'Continuing with test run...\n'
+        self.mixin_run_tests.append(self.log_phases)
+
+    def log_phases(self, tests, limit=20):
+        """Log the phases that took longest in total across all tests."""
+        durations = {}
+        counts = {}
+        for results in self.results:
+            for result in results:
+                for path, duration in getattr(result, 'spans', {}).items():
+                    durations[path] = durations.get(path, 0) + duration
+                    counts[path] = counts.get(path, 0) + result.span_counts[path]
+        if not durations:
+            return
+        self.logger.info('\nPHASES\n-------')
+        for path in sorted(durations, key=durations.get, reverse=True)[:limit]:
+            self.logger.info('%8.1fs %6dx %s' % (durations[path], counts[path], path))
 
@@ -0,0 +1,289 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import multiprocessing
+import os
+import Queue
+import random
+import time
+import traceback
+
+import mozdevice
+from moztest.results import TestResultCollection
+
+
+class ShardResult(TestResultCollection):
+    """Picklable copy of the results a shard worker collected for one test file.
+
+    Exposes the same attributes as MarionetteTestResult so the merged results
+    can be passed to the XML, HTML and Treeherder reporting unchanged.
+    """
+
+    def __init__(self, results):
+        TestResultCollection.__init__(self, 'MarionetteTest')
+        self.extend(results)
+        self.testsRun = results.testsRun
+        self.passed = results.passed
+
+    @property
+    def skipped(self):
+        return [t for t in self if t.result == 'SKIPPED']
+
+    @property
+    def expectedFailures(self):
+        return [t for t in self if t.result == 'KNOWN-FAIL']
+
+    @property
+    def unexpectedSuccesses(self):
+        return [t for t in self if t.result == 'UNEXPECTED-PASS']
+
+    @property
+    def tests_passed(self):
+        return [t for t in self if t.result == 'PASS']
+
+    @property
+    def errors(self):
+        return [t for t in self if t.result == 'ERROR']
+
+    @property
+    def failures(self):
+        return [t for t in self if t.result == 'UNEXPECTED-FAIL']
+
+
+class ShardingOptionsMixin(object):
+
+    def __init__(self, **kwargs):
+        group = self.add_option_group('sharding')
+        group.add_option('--devices',
+                         action='store',
+                         dest='devices',
+                         help='comma separated serial IDs of devices to run the tests on in '
+                              'parallel. Each device is forwarded to the port given by --address, '
+                              'incremented for every additional device',
+                         metavar='SERIALS')
+        group.add_option('--emulators',
+                         action='store',
+                         dest='emulators',
+                         type=int,
+                         help='number of emulators of the --emulator architecture to launch and '
+                              'run the tests on in parallel',
+                         metavar='COUNT')
+        self.verify_usage_handlers.append(self.verify_sharding_usage)
+
+    def verify_sharding_usage(self, options, tests):
+        if options.devices and options.emulators:
+            self.error('You can\'t specify both --devices and --emulators.')
+        if options.devices and not options.address:
+            self.error('You must specify the --address to forward the first device to.')
+        if options.emulators is not None:
+            if not options.emulator:
+                self.error('You must specify the --emulator architecture to launch.')
+            if options.emulators < 1:
+                self.error('Number of emulators must be greater than 0.')
+
+
+class ShardingTestRunnerMixin(object):
+
+    # seconds to wait for a message from the workers before checking that
+    # they are still running
+    shard_poll_interval = 10
+
+    def __init__(self, devices=None, emulators=None, **kwargs):
+        self.shard_targets = []
+        # tests for the workers to take, while the test sets are being queued
+        self.shard_tasks = None
+        if devices:
+            host, port = (self.address or 'localhost:2828').split(':')
+            for i, serial in enumerate(devices.split(',')):
+                self.shard_targets.append({
+                    'device_serial': serial,
+                    'address': '%s:%d' % (host, int(port) + i)})
+        elif emulators:
+            self.shard_targets = [{'emulator': self.emulator, 'address': None}
+                                  for i in range(emulators)]
+
+    def run_sharded_tests(self, tests):
+        """Run the tests across the shard targets.
+
+        The test list is resolved once, with the capabilities of the first
+        target to start, then queued for the workers by run_test_sets, so
+        --repeat, --shuffle, --total-chunks and --schedule apply as they do
+        on a single target. A worker that dies is reported as a failure.
+        """
+        self.reset_test_stats()
+        self.start_time = time.time()
+
+        tasks = multiprocessing.Queue()
+        messages = multiprocessing.Queue()
+        workers = dict((index, multiprocessing.Process(target=self.run_shard,
+                                                       args=(index, tasks, messages)))
+                       for index in range(len(self.shard_targets)))
+        for worker in workers.values():
+            worker.start()
+
+        pending = set(workers)
+        shards = []
+        queued = False
+        while pending:
+            kind, index, data = self.receive_shard_message(messages, workers, pending)
+            if kind == 'ready':
+                if not queued:
+                    self.queue_sharded_tests(tests, data, tasks)
+                    queued = True
+                continue
+            pending.discard(index)
+            shards.append(data)
+        for worker in workers.values():
+            worker.join()
+
+        self.logger.info('\nSHARDS\n-------')
+        for shard in shards:
+            if shard.get('error'):
+                self.logger.error('%s failed:\n%s' % (shard['target'], shard['error']))
+                self.failed += 1
+                self.failures.append((shard['target'], shard['error'], 'TEST-UNEXPECTED-FAIL'))
+                continue
+            self.logger.info('%s ran %d tests' % (
+                shard['target'], sum([results.testsRun for results in shard['results']])))
+            self.results.extend(shard['results'])
+            self.failures.extend(shard['failures'])
+            for stat in ['passed', 'failed', 'unexpected_successes', 'todo', 'skipped']:
+                setattr(self, stat, getattr(self, stat) + shard[stat])
+
+        # reporting tools that talk to the device need to pick one
+        serials = [t['device_serial'] for t in self.shard_targets if t.get('device_serial')]
+        if serials:
+            self.device_serial = serials[0]
+            os.environ['ANDROID_SERIAL'] = self.device_serial
+
+        self.logger.info('\nSUMMARY\n-------')
+        self.logger.info('passed: %d' % self.passed)
+        self.logger.info('failed: %d (unexpected successes: %d)' % (self.failed, self.unexpected_successes))
+        self.logger.info('todo: %d (skipped: %d)' % (self.todo, self.skipped))
+
+        if self.failed > 0:
+            self.logger.info('\nFAILED TESTS\n-------')
+            for failed_test in self.failures:
+                self.logger.info('%s' % failed_test[0])
+
+        self.end_time = time.time()
+        self.elapsedtime = self.end_time - self.start_time
+
+        if self.xml_output:
+            xml_dir = os.path.dirname(os.path.abspath(self.xml_output))
+            if not os.path.exists(xml_dir):
+                os.makedirs(xml_dir)
+            with open(self.xml_output, 'w') as f:
+                f.write(self.generate_xml(self.results))
+
+        for run_tests in self.mixin_run_tests:
+            run_tests(tests)
+        if self.shuffle:
+            self.logger.info("Using seed where seed is:%d" % self.shuffle_seed)
+
+        self.logger.suite_end()
+
+    def receive_shard_message(self, messages, workers, pending):
+        """Returns the next (kind, index, data) message from the workers.
+
+        A pending worker that exited without reporting its results is returned
+        as done, with an error.
+        """
+        while True:
+            try:
+                return messages.get(timeout=self.shard_poll_interval)
+            except Queue.Empty:
+                dead = [index for index in pending if not workers[index].is_alive()]
+                if not dead:
+                    continue
+            # a worker may have reported just before exiting
+            try:
+                return messages.get(timeout=1)
+            except Queue.Empty:
+                index = dead[0]
+                return ('done', index, {
+                    'target': self.shard_name(index),
+                    'error': 'Worker exited with code %s before reporting its results' %
+                             workers[index].exitcode})
+
+    def queue_sharded_tests(self, tests, capabilities, tasks):
+        """Resolve the tests with the capabilities of a target, and queue
+        them for the workers, followed by one stop marker for each."""
+        self._capabilities = capabilities
+        for test in tests:
+            self.add_test(test)
+        self.load_durations()
+        self.logger.suite_start(self.tests)
+
+        for test in self.manifest_skipped_tests:
+            name = os.path.basename(test['path'])
+            self.logger.test_start(name)
+            self.logger.test_end(name, 'SKIP', message=test['disabled'])
+            self.todo += 1
+
+        self.shard_tasks = tasks
+        try:
+            counter = self.repeat
+            while counter >= 0:
+                round = self.repeat - counter
+                if round > 0:
+                    self.logger.info('\nREPEAT %d\n-------' % round)
+                self.run_test_sets()
+                counter -= 1
+        finally:
+            self.shard_tasks = None
+            for target in self.shard_targets:
+                tasks.put(None)
+
+    def queue_test_set(self, tests):
+        if self.shuffle:
+            random.seed(self.shuffle_seed)
+            random.shuffle(tests)
+        for test in tests:
+            self.shard_tasks.put(test)
+
+    def shard_name(self, index):
+        return self.shard_targets[index].get('device_serial') or 'emulator %d' % (index + 1)
+
+    def run_shard(self, index, tasks, messages):
+        """Run tests on a single target, taking them one at a time from the task queue."""
+        target = self.shard_targets[index]
+        shard = {'target': self.shard_name(index)}
+        try:
+            self.device_serial = target.get('device_serial')
+            self.address = target.get('address')
+            self.emulator = target.get('emulator')
+            if self.device_serial:
+                os.environ['ANDROID_SERIAL'] = self.device_serial
+                mozdevice.DeviceManagerADB(deviceSerial=self.device_serial).forward(
+                    'tcp:%s' % self.address.split(':')[1], 'tcp:2828')
+
+            self.start_marionette()
+            if self.emulator:
+                self.marionette.emulator.wait_for_homescreen(self.marionette)
+            self.start_httpd(self.capabilities['device'] != 'desktop')
+            messages.put(('ready', index, self.capabilities))
+
+            while True:
+                test = tasks.get()
+                if test is None:
+                    break
+                self.run_test(test['filepath'], test['expected'], test['oop'])
+                if self.marionette.check_for_crash():
+                    break
+
+            shard.update({
+                'results': [ShardResult(results) for results in self.results],
+                'failures': self.failures})
+            for stat in ['passed', 'failed', 'unexpected_successes', 'todo', 'skipped']:
+                shard[stat] = getattr(self, stat)
+        except Exception:
+            shard['error'] = traceback.format_exc()
+        finally:
+            if self.marionette:
+                if self.marionette.instance:
+                    self.marionette.instance.close()
+                self.marionette.cleanup()
+            self.cleanup()
+            messages.put(('done', index, shard))
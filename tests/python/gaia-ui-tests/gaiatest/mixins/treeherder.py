@@ -2,14 +2,16 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import json
 import socket
 import time
-from urlparse import urljoin, urlparse
+from urlparse import urljoin
 import uuid
 
 import mozversion
-import requests
-from thclient import TreeherderRequest, TreeherderJobCollection
+from thclient import TreeherderJobCollection
+
+from gaiatest.outbox import Outbox, treeherder_sender
 
 DEVICE_GROUP_MAP = {
     'flame': {
@@ -46,14 +48,22 @@ class TreeherderOptionsMixin(object):
             '--treeherder-secret',
             help='OAuth secret for Treeherder instance.',
             metavar='SECRET')
+        treeherder.add_option(
+            '--outbox',
+            help='SQLite outbox to queue results in before sending them to '
+                 'Treeherder. Results that cannot be sent stay queued, and '
+                 'can be sent later with gaiatest-flush.',
+            metavar='PATH')
 
 
 class TreeherderTestRunnerMixin(object):
 
     def __init__(self, ci_url=None, treeherder=False,
                  treeherder_url='https://treeherder.mozilla.org/',
-                 treeherder_key=None, treeherder_secret=None, **kwargs):
+                 treeherder_key=None, treeherder_secret=None, outbox=None,
+                 **kwargs):
         self.ci_url = ci_url
+        self.outbox = outbox
         self.treeherder_url = treeherder_url
         self.treeherder_key = treeherder_key
         self.treeherder_secret = treeherder_secret
@@ -87,21 +97,10 @@ class TreeherderTestRunnerMixin(object):
                                   device, DEVICE_GROUP_MAP.keys()))
             return
 
-        # Determine revision hash from application revision
+        # The revision hash is looked up from the application revision when
+        # the job is sent
         revision = version['application_changeset']
         project = version['application_repository'].split('/')[-1]
-        lookup_url = urljoin(
-            self.treeherder_url,
-            'api/project/%s/revision-lookup/?revision=%s' % (
-                project, revision))
-        self.logger.debug('Getting revision hash from: %s' % lookup_url)
-        response = requests.get(lookup_url)
-        response.raise_for_status()
-        assert response.json(), 'Unable to determine revision hash for %s. ' \
-                                'Perhaps it has not been ingested by ' \
-                                'Treeherder?' % revision
-        revision_hash = response.json()[revision]['revision_hash']
-        job.add_revision_hash(revision_hash)
         job.add_project(project)
         job.add_job_guid(str(uuid.uuid4()))
         job.add_product_name('b2g')
@@ -175,18 +174,26 @@ class TreeherderTestRunnerMixin(object):
         job_collection.add(job)
 
         # Send the collection to Treeherder
-        url = urlparse(self.treeherder_url)
-        request = TreeherderRequest(
-            protocol=url.scheme,
-            host=url.hostname,
-            project=project,
-            oauth_key=self.treeherder_key,
-            oauth_secret=self.treeherder_secret)
+        destination = {'url': self.treeherder_url,
+                       'project': project,
+                       'revision': revision}
         self.logger.debug('Sending results to Treeherder: %s' %
                           job_collection.to_json())
-        response = request.post(job_collection)
-        self.logger.debug('Response: %s' % response.read())
-        assert response.status == 200, 'Failed to send results!'
+        jobs = json.loads(job_collection.to_json())
+        send = treeherder_sender(self.treeherder_key, self.treeherder_secret)
+        if self.outbox:
+            # also sends any results still queued from previous runs
+            outbox = Outbox(self.outbox)
+            outbox.put('treeherder', destination, jobs)
+            sent, failed = outbox.flush({'treeherder': send}, logger=self.logger)
+            outbox.close()
+            if failed:
+                self.logger.warning(
+                    'Results are queued in %s, send them later with '
+                    'gaiatest-flush.' % self.outbox)
+                return
+        else:
+            send(destination, jobs)
         self.logger.info('Results are available to view at: %s' % (
             urljoin(self.treeherder_url, '/ui/#/jobs?repo=%s&revision=%s' % (
                 project, revision))))
@@ -0,0 +1,226 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import json
+from multiprocessing.pool import ThreadPool
+from optparse import OptionParser
+import sqlite3
+import sys
+import time
+from urlparse import urljoin, urlparse
+
+import requests
+from thclient import TreeherderRequest, TreeherderJobCollection
+
+
+class Outbox(object):
+    """SQLite queue of result payloads waiting to be submitted to a service.
+
+    Payloads are only removed once they have been submitted, so results are
+    kept when the service is slow or down. A payload that fails to submit is
+    retried after an exponentially increasing delay.
+    """
+
+    def __init__(self, path, initial_delay=60, maximum_delay=3600):
+        self.path = path
+        self.initial_delay = initial_delay
+        self.maximum_delay = maximum_delay
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS outbox ('
+            'id INTEGER PRIMARY KEY, service TEXT NOT NULL, destination TEXT NOT NULL, '
+            'payload TEXT NOT NULL, queued REAL NOT NULL, attempts INTEGER NOT NULL, '
+            'next_attempt REAL NOT NULL, error TEXT)')
+        self.connection.commit()
+
+    def put(self, service, destination, payload):
+        """Queue a payload for the service.
+
+        The destination and payload must be serializable as JSON. The
+        destination says where to submit the payload, without credentials,
+        which are given to the senders when the outbox is flushed.
+        """
+        now = time.time()
+        self.connection.execute(
+            'INSERT INTO outbox (service, destination, payload, queued, attempts, next_attempt) '
+            'VALUES (?, ?, ?, ?, 0, ?)',
+            (service, json.dumps(destination), json.dumps(payload), now, now))
+        self.connection.commit()
+
+    def pending(self):
+        """Returns the number of queued payloads."""
+        return self.connection.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def due(self, services, limit):
+        return self.connection.execute(
+            'SELECT id, service, destination, payload, attempts FROM outbox '
+            'WHERE next_attempt <= ? AND service IN (%s) '
+            'ORDER BY next_attempt, id LIMIT ?' % ', '.join('?' * len(services)),
+            [time.time()] + list(services) + [limit]).fetchall()
+
+    def delay(self, attempts):
+        """Returns the seconds to wait before the next attempt."""
+        return min(self.initial_delay * 2 ** (attempts - 1), self.maximum_delay)
+
+    def flush(self, senders, batch_size=20, concurrency=4, logger=None):
+        """Submit the payloads that are due, a batch at a time.
+
+        Senders are called as sender(destination, payload) from up to
+        concurrency threads, and raise if the payload was not accepted. Payloads
+        for services without a sender are left queued. Returns the number of
+        payloads submitted and failed.
+        """
+        sent = failed = 0
+        pool = ThreadPool(concurrency)
+        tried = set()
+        try:
+            while True:
+                # payloads that failed are not due again during this flush
+                batch = [row for row in self.due(senders.keys(), batch_size + len(tried))
+                         if row[0] not in tried][:batch_size]
+                if not batch:
+                    break
+                tried.update(row[0] for row in batch)
+                errors = pool.map(_send, [(senders[service], destination, payload)
+                                          for _, service, destination, payload, _ in batch])
+                for (entry_id, service, _, _, attempts), error in zip(batch, errors):
+                    if error is None:
+                        self.connection.execute('DELETE FROM outbox WHERE id = ?', (entry_id,))
+                        sent += 1
+                        continue
+                    failed += 1
+                    attempts += 1
+                    self.connection.execute(
+                        'UPDATE outbox SET attempts = ?, next_attempt = ?, error = ? WHERE id = ?',
+                        (attempts, time.time() + self.delay(attempts), error, entry_id))
+                    if logger:
+                        logger.warning('Failed to submit to %s (attempt %d): %s' % (
+                            service, attempts, error))
+                self.connection.commit()
+        finally:
+            pool.close()
+        return sent, failed
+
+    def close(self):
+        self.connection.close()
+
+
+def _send(args):
+    sender, destination, payload = args
+    try:
+        sender(json.loads(destination), json.loads(payload))
+    except Exception as e:
+        return '%s: %s' % (type(e).__name__, e)
+
+
+def datazilla_sender(oauth_key, oauth_secret):
+    """Returns a sender of Datazilla datasets to
+    {'protocol': ..., 'host': ..., 'project': ...}."""
+    # dzclient is only needed to submit to Datazilla
+    import dzclient
+
+    def send(destination, dataset):
+        request = dzclient.DatazillaRequest(
+            protocol=destination['protocol'],
+            host=destination['host'],
+            project=destination['project'],
+            oauth_key=oauth_key,
+            oauth_secret=oauth_secret,
+            # describe the results, which are already in the dataset
+            machine_name='', os='', os_version='', platform='', build_name='',
+            version='', revision='', branch='', id='')
+        response = request.send(dataset)
+        assert response.status == 200, 'Datazilla responded with %d: %s' % (
+            response.status, response.read())
+    return send
+
+
+def treeherder_sender(oauth_key, oauth_secret):
+    """Returns a sender of Treeherder jobs to
+    {'url': ..., 'project': ..., 'revision': ...}.
+
+    The revision hash of each job is looked up when it is sent, so jobs can
+    be queued while Treeherder is unavailable.
+    """
+    def send(destination, jobs):
+        lookup_url = urljoin(
+            destination['url'],
+            'api/project/%s/revision-lookup/?revision=%s' % (
+                destination['project'], destination['revision']))
+        response = requests.get(lookup_url)
+        response.raise_for_status()
+        assert response.json(), 'Unable to determine revision hash for %s. ' \
+                                'Perhaps it has not been ingested by ' \
+                                'Treeherder?' % destination['revision']
+        revision_hash = response.json()[destination['revision']]['revision_hash']
+
+        job_collection = TreeherderJobCollection()
+        for data in jobs:
+            job = job_collection.get_job(data)
+            job.add_revision_hash(revision_hash)
+            job_collection.add(job)
+
+        url = urlparse(destination['url'])
+        request = TreeherderRequest(
+            protocol=url.scheme,
+            host=url.netloc,
+            project=destination['project'],
+            oauth_key=oauth_key,
+            oauth_secret=oauth_secret)
+        response = request.post(job_collection)
+        assert response.status == 200, 'Treeherder responded with %d: %s' % (
+            response.status, response.read())
+    return send
+
+
+def cli():
+    parser = OptionParser(usage='%prog [options] outbox',
+                          description='Submit the results queued in an outbox.')
+    parser.add_option('--treeherder-key',
+                      help='OAuth key for Treeherder instance',
+                      metavar='KEY')
+    parser.add_option('--treeherder-secret',
+                      help='OAuth secret for Treeherder instance',
+                      metavar='SECRET')
+    parser.add_option('--dz-key',
+                      dest='datazilla_key',
+                      help='OAuth key for Datazilla server',
+                      metavar='KEY')
+    parser.add_option('--dz-secret',
+                      dest='datazilla_secret',
+                      help='OAuth secret for Datazilla server',
+                      metavar='SECRET')
+    parser.add_option('--batch-size',
+                      type=int,
+                      default=20,
+                      help='number of results to submit at a time. Default: %default')
+    parser.add_option('--concurrency',
+                      type=int,
+                      default=4,
+                      help='number of results to submit at once. Default: %default')
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error('You must specify the outbox to flush.')
+
+    senders = {}
+    if options.treeherder_key and options.treeherder_secret:
+        senders['treeherder'] = treeherder_sender(
+            options.treeherder_key, options.treeherder_secret)
+    if options.datazilla_key and options.datazilla_secret:
+        senders['datazilla'] = datazilla_sender(
+            options.datazilla_key, options.datazilla_secret)
+    if not senders:
+        parser.error('You must specify the OAuth key and secret of at least one service.')
+
+    outbox = Outbox(args[0])
+    sent, failed = outbox.flush(senders, options.batch_size, options.concurrency)
+    pending = outbox.pending()
+    outbox.close()
+
+    print 'Submitted: %d, failed: %d, still queued: %d' % (sent, failed, pending)
+    return failed and 1 or 0
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
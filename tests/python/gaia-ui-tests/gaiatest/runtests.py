@@ -14,13 +14,16 @@ from marionette.runtests import cli
 
 from gaiatest import __name__
 from gaiatest import GaiaTestCase, GaiaOptionsMixin, GaiaTestRunnerMixin, \
-    TreeherderOptionsMixin, TreeherderTestRunnerMixin
+    TreeherderOptionsMixin, TreeherderTestRunnerMixin, \
+    ShardingOptionsMixin, ShardingTestRunnerMixin, \
+    DurationsOptionsMixin, DurationsTestRunnerMixin
 from version import __version__
 
 
 class GaiaTestOptions(BaseMarionetteOptions, GaiaOptionsMixin,
                       EnduranceOptionsMixin, HTMLReportingOptionsMixin,
-                      TreeherderOptionsMixin):
+                      TreeherderOptionsMixin, ShardingOptionsMixin,
+                      DurationsOptionsMixin):
 
     def __init__(self, **kwargs):
         BaseMarionetteOptions.__init__(self, **kwargs)
@@ -28,6 +31,8 @@ class GaiaTestOptions(BaseMarionetteOptions, GaiaOptionsMixin,
         HTMLReportingOptionsMixin.__init__(self, **kwargs)
         EnduranceOptionsMixin.__init__(self, **kwargs)
         TreeherderOptionsMixin.__init__(self, **kwargs)
+        ShardingOptionsMixin.__init__(self, **kwargs)
+        DurationsOptionsMixin.__init__(self, **kwargs)
 
 
 class GaiaTestResult(MarionetteTestResult, HTMLReportingTestResultMixin):
@@ -36,6 +41,18 @@ class GaiaTestResult(MarionetteTestResult, HTMLReportingTestResultMixin):
         MarionetteTestResult.__init__(self, *args, **kwargs)
         HTMLReportingTestResultMixin.__init__(self, *args, **kwargs)
 
+    def add_test_result(self, test, **kwargs):
+        MarionetteTestResult.add_test_result(self, test, **kwargs)
+        # keep a reference, as tearDown may still be running when the result is added
+        self[-1].phases = getattr(test, 'phase_durations', {})
+        timer = getattr(test, 'timer', None)
+        if timer:
+            self[-1].spans = timer.durations
+            self[-1].span_counts = timer.counts
+            if self[-1].debug is not None:
+                # linked from the failure in the HTML report
+                self[-1].debug['phases'] = timer.report()
+
 
 class GaiaTextTestRunner(MarionetteTextTestRunner):
 
@@ -43,7 +60,8 @@ class GaiaTextTestRunner(MarionetteTextTestRunner):
 
 
 class GaiaTestRunner(BaseMarionetteTestRunner, GaiaTestRunnerMixin,
-                     HTMLReportingTestRunnerMixin, TreeherderTestRunnerMixin):
+                     HTMLReportingTestRunnerMixin, TreeherderTestRunnerMixin,
+                     ShardingTestRunnerMixin, DurationsTestRunnerMixin):
 
     textrunnerclass = GaiaTextTestRunner
 
@@ -57,8 +75,40 @@ class GaiaTestRunner(BaseMarionetteTestRunner, GaiaTestRunnerMixin,
         HTMLReportingTestRunnerMixin.__init__(self, name=__name__,
                                               version=__version__, **kwargs)
         TreeherderTestRunnerMixin.__init__(self, **kwargs)
+        ShardingTestRunnerMixin.__init__(self, **kwargs)
+        DurationsTestRunnerMixin.__init__(self, **kwargs)
         self.test_handlers = [GaiaTestCase]
 
+    def run_tests(self, tests):
+        if self.shard_targets:
+            self.run_sharded_tests(tests)
+        else:
+            BaseMarionetteTestRunner.run_tests(self, tests)
+
+    def run_test_sets(self):
+        if self.schedule == 'longest-first':
+            self.load_durations()
+            if self.total_chunks > 1:
+                if self.total_chunks > len(self.tests):
+                    raise ValueError('Total number of chunks must be between 1 and %d.' % len(self.tests))
+                chunks = self.balance_chunks(self.tests, self.total_chunks)
+                self.logger.info('Running chunk %d of %d (%d tests selected from a '
+                                 'total of %d, balanced by predicted duration)' % (
+                                     self.this_chunk, self.total_chunks,
+                                     len(chunks[self.this_chunk - 1]), len(self.tests)))
+                self.tests = chunks[self.this_chunk - 1]
+                self.total_chunks = 1
+        BaseMarionetteTestRunner.run_test_sets(self)
+
+    def run_test_set(self, tests):
+        # across shards the slowest tests always start first
+        if (self.schedule == 'longest-first' or self.shard_tasks is not None) and not self.shuffle:
+            tests = self.prioritize_tests(tests)
+        if self.shard_tasks is not None:
+            self.queue_test_set(tests)
+        else:
+            BaseMarionetteTestRunner.run_test_set(self, tests)
+
     def start_httpd(self, need_external_ip):
         super(GaiaTestRunner, self).start_httpd(need_external_ip)
         self.httpd.urlhandlers.append({
@@ -0,0 +1,63 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import ast
+from optparse import OptionParser
+import os
+import sys
+
+
+def count_sleeps(path):
+    """Returns the line numbers of the time.sleep calls in a Python file."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    lines = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and \
+                isinstance(node.func, ast.Attribute) and \
+                node.func.attr == 'sleep' and \
+                isinstance(node.func.value, ast.Name) and \
+                node.func.value.id == 'time':
+            lines.append(node.lineno)
+    return sorted(lines)
+
+
+def sleep_report(root):
+    """Returns (path, line numbers) for each file under root that sleeps."""
+    report = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith('.py'):
+                continue
+            path = os.path.join(dirpath, filename)
+            lines = count_sleeps(path)
+            if lines:
+                report.append((os.path.relpath(path, root), lines))
+    return report
+
+
+def cli():
+    parser = OptionParser(usage='%prog [options] [path]')
+    parser.add_option('--max',
+                      type=int,
+                      help='exit with an error if there are more sleeps than this')
+    options, args = parser.parse_args()
+    if len(args) > 1:
+        parser.error('You can only specify one path to report on.')
+    root = args and args[0] or os.path.join(os.path.dirname(__file__), 'apps')
+
+    report = sleep_report(root)
+    total = sum(len(lines) for path, lines in report)
+    for path, lines in sorted(report, key=lambda r: len(r[1]), reverse=True):
+        print '%-70s %3d  (lines %s)' % (path, len(lines), ', '.join(str(l) for l in lines))
+    print '%d sleeps in %d files' % (total, len(report))
+
+    if options.max is not None and total > options.max:
+        print 'More than the %d sleeps allowed; wait for something instead.' % options.max
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
@@ -1,79 +1,176 @@
 #!/usr/bin/env python
 #
 # Compare endurance test results (avg b2g rss values) in the current run with
-# results from the previous test suite run. Flag if the b2g rss memory use
-# increases by x% in any of the tests; in future also compare with thresholds.
+# the results of previous test suite runs. A test is flagged when its b2g rss
+# memory use is significantly higher than its history, or has been trending
+# upwards across the runs. The rss of each app, recorded as
+# test_name[app origin], is compared in the same way as that of b2g.
 # To be run from Jenkins after the current results have been submitted to DataZilla.
 # In the Jenkins workspace:
-# ==> From current test run:  checkpoints/avg_b2g_rss_suite_summary.log
-# ==> From previous test run: checkpoints/frompreviousbuild/checkpoints/avg_b2g_rss_suite_summary.log
+# ==> From current test run:  checkpoints/*_results.jsonl
+# ==> From previous test run: checkpoints/frompreviousbuild/checkpoints/*_results.jsonl
+# Older runs can be passed as arguments, oldest first:
+#   compare_previous_results.py build1/checkpoints build2/checkpoints ...
+# Directories of builds from before results files were written are read from
+# their avg_b2g_rss_suite_summary.log, which can also be passed directly.
 
+import json
+import math
+from optparse import OptionParser
 import os
 import sys
 
+# import the results reader on its own, as the gaiatest package needs marionette
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from duration_store import median
+from endurance_results import load_averages
 
-def parse_results(suite_summary_file):
-    parsed_results = {}
+# Number of median absolute deviations above the historical median before a
+# result is flagged, and the minimum increase over the median, i.e. .1 (10%),
+# so that very stable history, or a single previous run, does not flag
+# insignificant changes
+DEFAULT_THRESHOLDS = {'deviations': 3.0,
+                      'increase': .1,
+                      # increase across the runs, from the fitted trend, before
+                      # a significant upward trend is flagged, i.e. .1 (10%)
+                      'trend': .1}
 
-    results_file = open(suite_summary_file, 'r')
-    read_in = results_file.read().split("\n")
-    results_file.close()
 
-    for x in read_in:
-        if x.find(':') != -1: # Ignore empty lines ie. last line of file which is empty
-            k, v = x.split(': ')
-            parsed_results[k] = v
+def mad(values):
+    """Returns the median absolute deviation of the values, scaled to estimate
+    the standard deviation of normally distributed values."""
+    center = median(values)
+    return 1.4826 * median([abs(v - center) for v in values])
+
+
+def theil_sen_slope(values):
+    """Returns the median slope between each pair of values, in units per run."""
+    slopes = [float(values[j] - values[i]) / (j - i)
+              for i in range(len(values)) for j in range(i + 1, len(values))]
+    return median(slopes)
+
+
+def mann_kendall_z(values):
+    """Returns the Mann-Kendall statistic for a monotonic trend in the values,
+    which is above 1.96 for an upward trend significant at the 5% level."""
+    n = len(values)
+    s = sum(cmp(values[j], values[i]) for i in range(n) for j in range(i + 1, n))
+    variance = n * (n - 1) * (2 * n + 5) / 18.0
+    if not variance:
+        return 0
+    if s > 0:
+        return (s - 1) / math.sqrt(variance)
+    if s < 0:
+        return (s + 1) / math.sqrt(variance)
+    return 0
+
+
+def compare(current_value, history, thresholds):
+    """Compare a test's current value with its history, oldest first."""
+    center = median(history)
+    spread = mad(history)
+    result = {'current': current_value,
+              'runs': len(history),
+              'median': center,
+              'mad': spread,
+              'increase': float(current_value - center) / center,
+              'deviations': None,
+              'trend': None,
+              'trend_z': None,
+              'regression': False,
+              'upward_trend': False}
+
+    if spread:
+        result['deviations'] = (current_value - center) / spread
+    if result['increase'] > thresholds['increase']:
+        result['regression'] = spread == 0 or result['deviations'] > thresholds['deviations']
+
+    values = history + [current_value]
+    if len(values) >= 4:
+        result['trend'] = theil_sen_slope(values) * (len(values) - 1) / center
+        result['trend_z'] = mann_kendall_z(values)
+        result['upward_trend'] = (result['trend'] > thresholds['trend'] and
+                                  result['trend_z'] > 1.96)
+    return result
 
-    return parsed_results
 
 def cli():
-    current_results = {}
-    previous_results = {}
-    current_results_file_name = 'checkpoints/avg_b2g_rss_suite_summary.log'
-    previous_results_file_name = 'checkpoints/frompreviousbuild/checkpoints/avg_b2g_rss_suite_summary.log'
+    parser = OptionParser(usage='%prog [options] [previous_results ...]',
+                          description='Compare avg b2g rss values of the current endurance run '
+                                      'with previous runs, given oldest first.')
+    parser.add_option('--current',
+                      default='checkpoints',
+                      help='results of the current run. Default: %default')
+    parser.add_option('--thresholds',
+                      help='JSON file of thresholds for each test, overriding the '
+                           'defaults of %s' % json.dumps(DEFAULT_THRESHOLDS, sort_keys=True))
+    parser.add_option('--json',
+                      dest='json_output',
+                      help='file to write the comparison to as JSON')
+    options, args = parser.parse_args()
+    previous_results_file_names = args or [
+        'checkpoints/frompreviousbuild/checkpoints']
     flagged_count = 0
 
-    # Allowed deviation i.e. current value change from previous value, max allowed deviation before
-    # the result is flagged as a failure; i.e. .1 (10%)
-    allowed_deviation = .1
+    test_thresholds = {}
+    if options.thresholds:
+        with open(options.thresholds) as f:
+            test_thresholds = json.load(f)
 
     # Get current and previous results
-    current_results = parse_results(current_results_file_name)
+    current_results = load_averages(options.current)
     if len(current_results) == 0:
-        print "No results found in avg_b2g_rss_suite_summary.log from current test run."
+        print "No results found in %s from current test run." % options.current
         exit(0)
 
-    previous_results = parse_results(previous_results_file_name)
+    previous_results = [r for r in map(load_averages, previous_results_file_names) if r]
     if len(previous_results) == 0:
-        print "No results found in avg_b2g_rss_suite_summary.log from previous test run."
+        print "No results found from previous test runs in %s." % ', '.join(previous_results_file_names)
         exit(0)
 
     # Compare; if want to flag return error code so jenkins will be marked as fail and send email
-    for current_test, current_value in current_results.iteritems():
-        try:
-            current_value = int(current_value)
-            previous_value = int(previous_results[current_test])
-            print "\nTest: %s" % current_test
-            print "Current test value: %d" % current_value
-            print "Previous test value: %d" % previous_value
-            difference = abs(current_value - previous_value)
-            max_difference = previous_value * allowed_deviation
-            print "Allowed deviation: %d (%d percent variation)" % (max_difference, allowed_deviation * 100)
-            print "Difference: %d (%.2f percent)" % (difference, (float(difference) / previous_value) * 100.00)
-            if difference > max_difference:
-                print "Avg b2g rss value has changed more than the allowed deviation!"
-                flagged_count += 1
-            else:
-                print "Avg b2g rss value change is within the allowable deviation."
-            # TO-DO
-            # Check current values against thresholds; since variation could occur over time that is under
-            # the allowed deviation but over time exceeds it; and want to be sure to flag that also
-        except:
-            print "No previous results exist for '%s' test." % current_test
-    
+    comparisons = {}
+    for current_test, current_value in sorted(current_results.iteritems()):
+        history = [results[current_test] for results in previous_results
+                   if current_test in results]
+        if not history:
+            print "\nNo previous results exist for '%s' test." % current_test
+            continue
+        thresholds = dict(DEFAULT_THRESHOLDS, **test_thresholds.get(current_test, {}))
+        comparison = compare(current_value, history, thresholds)
+        comparisons[current_test] = comparison
+        test_name, app = current_test.rstrip(']').partition('[')[::2]
+        if app:
+            comparison['app'] = app
+
+        print "\nTest: %s" % test_name
+        if app:
+            print "App: %s" % app
+        print "Current test value: %d" % comparison['current']
+        print "Previous test values: %d runs, median %d, MAD %d" % (
+            comparison['runs'], comparison['median'], comparison['mad'])
+        print "Difference from median: %.2f percent%s" % (
+            comparison['increase'] * 100,
+            comparison['deviations'] is not None and ' (%.1f MADs)' % comparison['deviations'] or '')
+        if comparison['trend'] is not None:
+            print "Trend across runs: %.2f percent (Mann-Kendall z %.2f)" % (
+                comparison['trend'] * 100, comparison['trend_z'])
+        if comparison['regression']:
+            print "Avg %s rss value is significantly higher than in previous runs!" % (app or 'b2g')
+        if comparison['upward_trend']:
+            print "Avg %s rss value has been trending upwards!" % (app or 'b2g')
+        if comparison['regression'] or comparison['upward_trend']:
+            flagged_count += 1
+        else:
+            print "Avg %s rss value is within the expected range." % (app or 'b2g')
+
     print "\nNumber of tests with flagged results: %d" % flagged_count
     print "\nFinished.\n"
 
+    if options.json_output:
+        with open(options.json_output, 'w') as f:
+            json.dump({'flagged': flagged_count, 'tests': comparisons}, f, indent=2, sort_keys=True)
+
     if flagged_count:
         sys.exit(1)
 
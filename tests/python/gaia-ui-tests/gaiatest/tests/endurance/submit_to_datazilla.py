@@ -3,11 +3,13 @@
 # How to submit gaia-ui endurance test results to Datazilla:
 # 1) Attach a b2g device with an engineering build
 # 2) Issue 'adb forward tcp:2828 tcp:2828' cmd
-# 3) Run a gaia-ui endurance test, resulting in a checkpoint_*_summary.log results file
+# 3) Run a gaia-ui endurance test, resulting in a checkpoint_*_results.jsonl results file
 # 4) Keep the device connected, and turn on wifi (so device can get a macAddress), then
 # 5) Run this script and provide the command line options/values, including '--print'
 # 6) Review the results as displayed in the console, verify
 # 7) To submit the results, repeat the cmd but use '--submit' instead of '--print'
+# With '--outbox', results are queued in the given outbox and submitted from
+# there; any that cannot be submitted stay queued, for 'gaiatest-flush' to send later
 
 from optparse import OptionParser
 from StringIO import StringIO
@@ -19,14 +21,17 @@ import time
 
 import dzclient
 import gaiatest
+from gaiatest.endurance_results import EnduranceRun, find_runs
+from gaiatest.outbox import Outbox, datazilla_sender
 from marionette import Marionette
 import mozdevice
 
 
 class DatazillaPerfPoster(object):
 
-    def __init__(self, marionette, datazilla_config=None, sources=None):
+    def __init__(self, marionette, datazilla_config=None, sources=None, outbox=None):
         self.marionette = marionette
+        self.outbox = outbox
 
         settings = gaiatest.GaiaData(self.marionette).all_settings  # get all settings
         mac_address = self.marionette.execute_script('return navigator.mozWifiManager && navigator.mozWifiManager.macAddress;')
@@ -104,15 +109,28 @@ class DatazillaPerfPoster(object):
             branch=self.required.get('branch'),
             id=self.required.get('id'))
 
-        # Send DataZilla results
+        # Send DataZilla results, or queue them to be sent from the outbox
         req.add_datazilla_result(res)
         for dataset in req.datasets():
             dataset['test_build'].update(self.ancillary_data)
             dataset['test_machine'].update({'type': self.required.get('device name')})
+            if self.outbox:
+                print '\nQueueing results for DataZilla: %s' % dataset
+                self.outbox.put('datazilla', {'protocol': self.required.get('protocol'),
+                                              'host': self.required.get('host'),
+                                              'project': self.required.get('project')}, dataset)
+                continue
             print '\nSubmitting results to DataZilla: %s' % dataset
             response = req.send(dataset)
             print 'Response: %s\n' % response.read()
 
+    def flush(self):
+        """Submit the results queued in the outbox, and any queued before."""
+        sent, failed = self.outbox.flush({'datazilla': datazilla_sender(
+            self.required.get('oauth key'), self.required.get('oauth secret'))})
+        print '\nSubmitted %d results to DataZilla, %d failed and %d are still queued.\n' % (
+            sent, failed, self.outbox.pending())
+
 
 class dzOptionParser(OptionParser):
     def __init__(self, **kwargs):
@@ -121,7 +139,7 @@ class dzOptionParser(OptionParser):
                         action='store',
                         dest='results_file',
                         metavar='str',
-                        help='Json checkpoint results file from the endurance test')
+                        help='Results file, or checkpoint summary log, from the endurance test')
         self.add_option('--dz-url',
                         action='store',
                         dest='datazilla_url',
@@ -162,11 +180,17 @@ class dzOptionParser(OptionParser):
                         action='store_true',
                         dest='send_to_datazilla',
                         help='Send results to datazilla')
+        self.add_option('--outbox',
+                        action='store',
+                        dest='outbox',
+                        metavar='str',
+                        help='SQLite outbox to queue results in, and submit them from')
         self.add_option('--process-dir',
                         action='store',
                         dest='process_dir',
                         metavar='str',
-                        help='Process all *_summary.log files in the given folder')
+                        help='Process all results files in the given folder, or all '
+                             '*_summary.log files if it has none')
 
     def datazilla_config(self, options):
         if options.sources:
@@ -176,7 +200,7 @@ class dzOptionParser(OptionParser):
         datazilla_url = urlparse(options.datazilla_url)
         datazilla_config = {
             'protocol': datazilla_url.scheme,
-            'host': datazilla_url.hostname,
+            'host': datazilla_url.netloc,
             'project': options.datazilla_project,
             'branch': options.datazilla_branch,
             'device_name': options.datazilla_device_name,
@@ -221,7 +245,9 @@ def cli():
     marionette.start_session()
 
     # Create datazilla post object
-    poster = DatazillaPerfPoster(marionette, datazilla_config=datazilla_config, sources=options.sources)
+    outbox = options.outbox and Outbox(options.outbox)
+    poster = DatazillaPerfPoster(marionette, datazilla_config=datazilla_config,
+                                 sources=options.sources, outbox=outbox)
 
     # If was an error getting required values then poster.submit_report will be false;
     # if it is true then ok to submit if user wants to
@@ -229,93 +255,70 @@ def cli():
         if not options.send_to_datazilla:
             poster.submit_report = False
 
-    # Parse checkpoint results from provided summary log file
-    checkpoint_summary = {}
-    results = {}
     summary_file_list = []
 
     if options.process_dir:
         # All files in the given path
-        file_path = options.process_dir
-        print "\nSearching for *_summary.log files in %s\n" % options.process_dir
-
-        entire_file_list = os.listdir(file_path)
-
-        if len(entire_file_list) == 0:
-            raise Exception("No checkpoint *_summary.log files were found in the given path")
-        for found_file in entire_file_list:
-            if found_file.endswith("summary.log") and found_file != "avg_b2g_rss_suite_summary.log":
-                summary_file_list.append("%s/%s" % (file_path, found_file))
+        print "\nSearching for results files in %s\n" % options.process_dir
+        summary_file_list = find_runs(options.process_dir)
         if len(summary_file_list) == 0:
-            raise Exception("No checkpoint *_summary.log files were found in the given path")
+            raise Exception("No results files or checkpoint *_summary.log files were found in the given path")
 
-        print "Found the following checkpoint summary files to process:\n"
+        print "Found the following results files to process:\n"
         for x in summary_file_list:
             print "%s" % x
-        print "\n" + "-" * 50         
+        print "\n" + "-" * 50
     else:
         # Just one file
         summary_file_list = [options.results_file]
 
     for next_file in summary_file_list:
 
-        # Clear results as only want results for current file being processed
-        results = {}
-
         print "\nProcessing results in '%s'\n" % next_file
 
-        summary_file = open(next_file, 'r')
-        read_in = summary_file.read().split("\n")
-        summary_file.close()
+        run = EnduranceRun.read(next_file)
+        # Prefix test name so all tests are grouped together in datazilla
+        test_name = "endurance_" + run.test_name
 
-        for x in read_in:
-            try:
-                if x.find(':') != -1: # Ignore empty lines ie. last line of file which is empty
-                    k, v = x.split(': ')
-                    if k in "total_iterations" or k in "checkpoint_interval":
-                        checkpoint_summary[k] = int(v)
-                    elif k in "b2g_rss":
-                        checkpoint_summary[k] = v.split(',') # list of strings
-                        checkpoint_summary[k] = map(int, checkpoint_summary[k]) # list of ints
-                    elif k in "test_name":
-                        # Prefix test name so all tests are grouped together in datazilla
-                        checkpoint_summary[k] = "endurance_" + v
-                    else:
-                        checkpoint_summary[k] = v
-            except:
-                raise Exception("Value missing from '%s', cannot proceed." % options.results_file)
-    
         # Make sure we have app_under_test
-        if (checkpoint_summary['app_under_test'] == "none"):
-            raise Exception("Checkpoint summary file is missing value for 'app_under_test'. Cannot proceed.")
-        
+        if not run.app_under_test or run.app_under_test == "none":
+            raise Exception("'%s' is missing a value for 'app_under_test'. Cannot proceed." % next_file)
+
         # Results dictionary required format example
         # {'test_name': [180892, 180892, 181980, 181852, 180828, 182012, 183652, 182972, 183052, 183052]}
-        results[checkpoint_summary['test_name']] = checkpoint_summary['b2g_rss']
-    
+        results = {test_name: run.b2g_rss}
+        # and the rss of each app, as {'test_name_app': [...]}, e.g. test_name_clock.gaiamobile.org
+        for origin, rss in run.rss_by_app.items():
+            results['%s_%s' % (test_name, urlparse(origin).hostname or origin)] = rss
+
         # Display the Datazilla configuration
         print 'Datazilla configuration:'
-        print "\napplication (datazilla 'suite'): %s" % checkpoint_summary['app_under_test']
+        print "\napplication (datazilla 'suite'): %s" % run.app_under_test
         for key, value in poster.required.items():
             print key + ":", value
     
         # Submit or print the results
         if poster.submit_report:
-            #poster.post_to_datazilla(results, checkpoint_summary['test_name'])
-            poster.post_to_datazilla(results, checkpoint_summary['app_under_test'])
+            poster.post_to_datazilla(results, run.app_under_test)
         else:
-            print "\nCheckpoint summary for test '%s':\n" % checkpoint_summary['test_name']
-            print checkpoint_summary
+            print "\nCheckpoint summary for test '%s':\n" % test_name
+            print "iterations: %d, checkpoint interval: %d" % (run.iterations, run.checkpoint_interval)
+            print "iteration durations: %s" % run.iteration_summary()
             print '\nEndurance test results data:\n'
             print results
             print "\nTo submit results, fix any missing fields and use the '--submit' option.\n"
 
-        if options.process_dir:
+        if options.process_dir and not outbox:
             # Sleep between submissions
             print "Pausing...\n"
             time.sleep(30)
             print "-" * 50
 
+    if outbox:
+        if poster.submit_report:
+            poster.flush()
+        outbox.close()
+
     if options.process_dir:
         print "\nFinished processing all files.\n"
 
@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: 40 minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.mocks.mock_contact import MockContact
 from gaiatest.apps.contacts.app import Contacts
@@ -43,11 +41,11 @@ class TestEnduranceAddContact(GaiaEnduranceTestCase):
 
         # Save new contact
         new_contact_form.tap_done()
-        time.sleep(2)
+        self.pause(2)
 
         # Ensure all contacts were added
         if self.iteration == self.iterations:
             self.assertEqual(len(self.contacts.contacts), self.iterations)
 
         # Sleep between reps
-        time.sleep(3)
+        self.pause(3)
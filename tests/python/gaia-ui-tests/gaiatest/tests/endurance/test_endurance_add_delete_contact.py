@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: 88 minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.mocks.mock_contact import MockContact
 from gaiatest.apps.contacts.app import Contacts
@@ -43,13 +41,13 @@ class TestEnduranceAddDeleteContact(GaiaEnduranceTestCase):
 
         # Save new contact
         new_contact_form.tap_done()
-        time.sleep(2)
+        self.pause(2)
 
         # Verify a new contact was added
         self.wait_for_condition(lambda m: len(self.contacts.contacts) == 1)
 
         # Wait a couple of seconds before deleting
-        time.sleep(2)
+        self.pause(2)
 
         # Delete the contact
         contact_item = self.contacts.contact(contact['givenName'])
@@ -57,9 +55,9 @@ class TestEnduranceAddDeleteContact(GaiaEnduranceTestCase):
         contact_item_edit = contact_item_detail.tap_edit()
         contact_item_edit.tap_delete()
         contact_item_edit.tap_confirm_delete()
-        time.sleep(1)
+        self.pause(1)
 
         self.assertEqual(len(self.contacts.contacts), 0, 'Should have no contacts.')
 
         # Wait a couple of seconds before the next iteration
-        time.sleep(2)
+        self.pause(2)
@@ -60,7 +60,7 @@ class TestEnduranceAddDeleteEvent(GaiaEnduranceTestCase):
         self.wait_for_element_displayed(*self._add_event_button_locator)
 
         # click the add event button
-        time.sleep(1)
+        self.pause(1)
         add_event_button = self.marionette.find_element(*self._add_event_button_locator)
         add_event_button.tap()
         self.wait_for_element_displayed(*self._event_title_input_locator)
@@ -76,10 +76,10 @@ class TestEnduranceAddDeleteEvent(GaiaEnduranceTestCase):
         self.marionette.find_element(*self._event_start_time_input_locator).send_keys(event_start_time)
         self.marionette.find_element(*self._event_end_time_input_locator).clear()
         self.marionette.find_element(*self._event_end_time_input_locator).send_keys(event_end_time)
-        time.sleep(1)
+        self.pause(1)
         save_event_button = self.marionette.find_element(*self._save_event_button_locator)
         save_event_button.tap()
-        time.sleep(2)
+        self.pause(2)
 
         # wait for the default calendar display
         self.wait_for_element_displayed(*self._this_event_time_slot_locator)
@@ -105,4 +105,4 @@ class TestEnduranceAddDeleteEvent(GaiaEnduranceTestCase):
         self.next_event_date += datetime.timedelta(days=1)
 
         # Wait between reps
-        time.sleep(3)
+        self.pause(3)
@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: 90 minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.mocks.mock_contact import MockContact
 from gaiatest.apps.contacts.app import Contacts
@@ -48,13 +46,13 @@ class TestEnduranceAddEditContact(GaiaEnduranceTestCase):
 
         # Save new contact
         new_contact_form.tap_done()
-        time.sleep(2)
+        self.pause(2)
 
         # Verify a new contact was added
         self.wait_for_condition(lambda m: len(self.contacts.contacts) == self.iteration)
 
         # Wait a couple of seconds before editing
-        time.sleep(2)
+        self.pause(2)
 
         # Edit the contact
         contact_item = self.contacts.contact(contact['givenName'])
@@ -66,9 +64,9 @@ class TestEnduranceAddEditContact(GaiaEnduranceTestCase):
         contact_item_edit.type_given_name(contact['givenName'])
 
         contact_details = contact_item_edit.tap_update()
-        time.sleep(2)
+        self.pause(2)
         contact_details.tap_back()
-        time.sleep(2)
+        self.pause(2)
 
         self.assertEqual(len(self.contacts.contacts), self.iteration)
         contact_details = self.contacts.contact(contact['givenName']).tap()
@@ -81,4 +79,4 @@ class TestEnduranceAddEditContact(GaiaEnduranceTestCase):
         contact_details.tap_back()
 
         # Sleep between reps
-        time.sleep(3)
+        self.pause(3)
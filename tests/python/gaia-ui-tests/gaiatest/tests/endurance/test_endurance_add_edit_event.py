@@ -82,7 +82,7 @@ class TestEnduranceAddEditEvent(GaiaEnduranceTestCase):
         self.marionette.find_element(*self._event_start_time_input_locator).send_keys(event_start_time)
         self.marionette.find_element(*self._event_end_time_input_locator).clear()
         self.marionette.find_element(*self._event_end_time_input_locator).send_keys(event_end_time)
-        time.sleep(1)
+        self.pause(1)
         save_event_button = self.marionette.find_element(*self._save_event_button_locator)
         save_event_button.tap()
 
@@ -104,7 +104,7 @@ class TestEnduranceAddEditEvent(GaiaEnduranceTestCase):
         self.wait_for_element_displayed(*self._event_title_input_locator)
         self.marionette.find_element(*self._event_title_input_locator).send_keys(" edited")
         event_title = event_title + " edited"
-        time.sleep(1)
+        self.pause(1)
 
         # Click Done button to save changes
         done_edit_button = self.marionette.find_element(*self._done_edit_button_locator)
@@ -124,4 +124,4 @@ class TestEnduranceAddEditEvent(GaiaEnduranceTestCase):
         self.next_event_date += datetime.timedelta(days=1)
 
         # Wait a bit between iterations
-        time.sleep(3)
+        self.pause(3)
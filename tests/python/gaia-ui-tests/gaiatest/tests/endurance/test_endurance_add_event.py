@@ -78,7 +78,7 @@ class TestEnduranceAddEvent(GaiaEnduranceTestCase):
         self.marionette.find_element(*self._event_start_time_input_locator).send_keys(event_start_time)
         self.marionette.find_element(*self._event_end_time_input_locator).clear()
         self.marionette.find_element(*self._event_end_time_input_locator).send_keys(event_end_time)
-        time.sleep(1)
+        self.pause(1)
         save_event_button = self.marionette.find_element(*self._save_event_button_locator)
         save_event_button.tap()
 
@@ -96,4 +96,4 @@ class TestEnduranceAddEvent(GaiaEnduranceTestCase):
         self.next_event_date += datetime.timedelta(days=1)
 
         # sleep between reps
-        time.sleep(3)
+        self.pause(3)
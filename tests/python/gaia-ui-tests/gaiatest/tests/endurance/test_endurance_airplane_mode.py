@@ -8,8 +8,6 @@ from gaiatest import GaiaEnduranceTestCase
 
 import os
 import datetime
-import time
-
 
 class TestEnduranceAirplaneMode(GaiaEnduranceTestCase):
 
@@ -50,7 +48,7 @@ class TestEnduranceAirplaneMode(GaiaEnduranceTestCase):
         self.marionette.tap(airplane_mode_button)
 
         # Sleep
-        time.sleep(20)
+        self.pause(20)
 
         # Close the utility tray
         self.marionette.execute_script("window.wrappedJSObject.UtilityTray.hide()")
@@ -75,14 +73,14 @@ class TestEnduranceAirplaneMode(GaiaEnduranceTestCase):
         self.marionette.tap(airplane_mode_button)
 
         # Sleep
-        time.sleep(20)
+        self.pause(20)
 
         # Close the utility tray
         self.marionette.execute_script("window.wrappedJSObject.UtilityTray.hide()")
         self.wait_for_element_not_displayed(*self._utility_tray_locator)
 
         # Sleep between reps
-        time.sleep(3)
+        self.pause(3)
 
     def verify_cell(self, expect_enabled):
         # Verify cell network enabled/disabled via settings menu (some code from test_settings_cell)
@@ -90,7 +88,7 @@ class TestEnduranceAirplaneMode(GaiaEnduranceTestCase):
         self.wait_for_element_displayed(*self._cell_data_menu_item_locator)
         cell_data_menu_item = self.marionette.find_element(*self._cell_data_menu_item_locator)
         self.marionette.tap(cell_data_menu_item)
-        time.sleep(2)
+        self.pause(2)
 
         if expect_enabled:
             # Verify that a carrier is displayed
@@ -105,4 +103,4 @@ class TestEnduranceAirplaneMode(GaiaEnduranceTestCase):
         # Close settings
         self.close_app()
         self.marionette.switch_to_frame()
-        time.sleep(2)
+        self.pause(2)
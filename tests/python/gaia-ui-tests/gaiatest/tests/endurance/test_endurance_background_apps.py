@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: 107 minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 
 
@@ -27,10 +25,10 @@ class TestEnduranceBackgroundApps(GaiaEnduranceTestCase):
             # Launch the app
             print "Launching %s app..." %next_app
             app_objs.append(self.apps.launch(next_app))
-            time.sleep(5)
+            self.pause(5)
             # Minimize app into the background
             self.device.touch_home_button()
-            time.sleep(5)
+            self.pause(5)
 
     def test_endurance_background_apps(self):
         self.drive(test=self.background_apps, app='homescreen')
@@ -47,4 +45,4 @@ class TestEnduranceBackgroundApps(GaiaEnduranceTestCase):
         self.assertTrue("homescreen" in running_apps, "homescreen app should be running!")
 
         # Just leave apps running in background
-        time.sleep(60)
+        self.pause(60)
@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: 60 minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.apps.browser.app import Browser
 
@@ -38,14 +36,14 @@ class TestEnduranceBrowserWifi(GaiaEnduranceTestCase):
         self.assertEqual(heading.text, 'We believe that the internet should be public, open and accessible.')
 
         # Wait a couple of seconds with page displayed
-        time.sleep(2)
+        self.pause(2)
 
         # Close the browser using home button
         self.app = browser
         self.close_app()
 
         # Sleep between iterations
-        time.sleep(10)
+        self.pause(10)
 
     def tearDown(self):
         GaiaEnduranceTestCase.tearDown(self)
@@ -7,8 +7,6 @@
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.apps.camera.app import Camera
 
-import time
-
 
 class TestEnduranceCameraPhoto(GaiaEnduranceTestCase):
 
@@ -25,14 +23,14 @@ class TestEnduranceCameraPhoto(GaiaEnduranceTestCase):
         # Start camera
         camera_app = Camera(self.marionette)
         camera_app.launch()
-        time.sleep(5)
+        self.pause(5)
 
         # Take a photo
         camera_app.take_photo()
 
         # Sleep a bit then close the app
-        time.sleep(5)
+        self.pause(5)
         self.close_app()
 
         # Sleep between iterations
-        time.sleep(5)
+        self.pause(5)
@@ -7,8 +7,6 @@
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.apps.camera.app import Camera
 
-import time
-
 
 class TestEnduranceCameraVideo(GaiaEnduranceTestCase):
 
@@ -31,15 +29,15 @@ class TestEnduranceCameraVideo(GaiaEnduranceTestCase):
         camera_app.launch()
 
         # Swtich to video
-        time.sleep(5)
+        self.pause(5)
         camera_app.tap_switch_source()
 
         # Record a video for the specified duration
         camera_app.record_video(self.duration)
 
         # Sleep a bit and close the app
-        time.sleep(5)
+        self.pause(5)
         self.close_app()
 
         # Wait between iterations
-        time.sleep(5)
+        self.pause(5)
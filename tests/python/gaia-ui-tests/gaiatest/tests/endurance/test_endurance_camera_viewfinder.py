@@ -7,8 +7,6 @@
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.apps.camera.app import Camera
 
-import time
-
 
 class TestEnduranceCameraViewfinder(GaiaEnduranceTestCase):
 
@@ -27,10 +25,10 @@ class TestEnduranceCameraViewfinder(GaiaEnduranceTestCase):
         camera_app.launch()
 
         # Leave viewfinder running / displayed for 30 seconds
-        time.sleep(30)
+        self.pause(30)
 
         # Sleep a bit then close the app
         self.close_app()
 
         # Sleep between iterations
-        time.sleep(5)
+        self.pause(5)
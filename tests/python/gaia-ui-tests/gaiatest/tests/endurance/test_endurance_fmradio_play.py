@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: 62 minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.apps.fmradio.app import FmRadio
 
@@ -26,7 +24,7 @@ class TestEnduranceFMRadioPlay(GaiaEnduranceTestCase):
         self.wait_for_condition(lambda m: self.data_layer.is_fm_radio_enabled)
 
         # stay on initial station for a few seconds
-        time.sleep(5)
+        self.pause(5)
 
     def test_endurance_fmradio_play(self):
         self.drive(test=self.fmradio_play, app='fm_radio')
@@ -48,4 +46,4 @@ class TestEnduranceFMRadioPlay(GaiaEnduranceTestCase):
 
         # Stay on new station for awhile; 33 seconds for 100 iterations; with checkpoints
         # every 10 iterations (radio plays during checkpoints) = 60 minutes of radio play
-        time.sleep(33)
+        self.pause(33)
@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: xxx minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.apps.gallery.app import Gallery
 
@@ -34,11 +32,11 @@ class TestEnduranceGalleryCamera(GaiaEnduranceTestCase):
         # 2. when the UI/Camera button appears, tap it to switch to the camera
         # 3. when the UI/Gallery button appears, tap it to switch back to the gallery
         # 4. repeat steps 2 and 3 until *crash*
-        time.sleep(3)
+        self.pause(3)
 
         # From gallery app, switch to camera app
         self.camera = self.gallery.switch_to_camera()
-        time.sleep(3)
+        self.pause(3)
 
         # From camera app, switch back to gallery again
         self.gallery = self.camera.tap_switch_to_gallery()
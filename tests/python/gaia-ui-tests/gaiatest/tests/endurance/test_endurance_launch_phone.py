@@ -5,8 +5,6 @@
 # Approximate runtime per 100 iterations: 27 minutes
 
 from gaiatest import GaiaEnduranceTestCase
-import time
-
 
 class TestEnduranceLaunchPhone(GaiaEnduranceTestCase):
 
@@ -15,6 +13,6 @@ class TestEnduranceLaunchPhone(GaiaEnduranceTestCase):
 
     def launch_phone(self):
        self.app = self.apps.launch('Phone')
-       time.sleep(5)
+       self.pause(5)
        self.apps.kill(self.app)
-       time.sleep(5)
+       self.pause(5)
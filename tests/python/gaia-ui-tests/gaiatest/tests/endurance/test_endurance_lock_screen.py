@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: 17 minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 
 
@@ -28,7 +26,7 @@ class TestEnduranceLockScreen(GaiaEnduranceTestCase):
 
         # Lock screen
         self.device.lock()
-        time.sleep(2)
+        self.pause(2)
 
         # verify screen is locked
         self.wait_for_element_displayed(*self._lockscreen_locator)
@@ -36,4 +34,4 @@ class TestEnduranceLockScreen(GaiaEnduranceTestCase):
 
         # Unlock screen
         self.device.unlock()
-        time.sleep(2)
+        self.pause(2)
@@ -6,8 +6,6 @@ from gaiatest import GaiaEnduranceTestCase
 
 import os
 import datetime
-import time
-
 
 class TestEnduranceMusicPlayback(GaiaEnduranceTestCase):
 
@@ -57,7 +55,7 @@ class TestEnduranceMusicPlayback(GaiaEnduranceTestCase):
         # Play music for 5 seconds and verify via UI; most code taken from test_music_album_mp3.py
 
         # need a wait but cannot due to an is_displayed bug
-        time.sleep(2)
+        self.pause(2)
 
         # select play
         views_sublist_controls_play = self.marionette.find_element(*self._views_sublist_controls_play_locator)
@@ -83,7 +81,7 @@ class TestEnduranceMusicPlayback(GaiaEnduranceTestCase):
         player_controls_play.tap()
 
         # wait to be sure the pause settles in
-        time.sleep(2)
+        self.pause(2)
 
         # validate stopped playback
         self.assertEqual(audiotag.get_attribute('paused'), 'true')
@@ -2,8 +2,6 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 
 # Approximate runtime per 100 iterations: xxx minutes
@@ -32,7 +30,7 @@ class TestEnduranceBrowserWifi(GaiaEnduranceTestCase):
         self.wait_for_element_not_displayed(*self._loading_overlay)
 
         # Wait with page displayed
-        time.sleep(5)
+        self.pause(5)
 
         # Close the browser using home button; my close_app doesn't work here b/c name (fix later)
         self.device.touch_home_button()
@@ -43,7 +41,7 @@ class TestEnduranceBrowserWifi(GaiaEnduranceTestCase):
         self.wait_for_element_displayed(*_cards_view_locator)
 
         # Sleep a bit
-        time.sleep(2)
+        self.pause(2)
 
         # Tap the close icon for the current app
         locator_part_two = '#cards-view li.card[data-origin*="email"] .close-card'
@@ -52,7 +50,7 @@ class TestEnduranceBrowserWifi(GaiaEnduranceTestCase):
         close_card_app_button.tap()
 
         # Wait a couple of seconds between iterations
-        time.sleep(2)
+        self.pause(2)
 
     def is_throbber_visible(self):
         return self.marionette.find_element(*self._throbber_locator).get_attribute('class') == 'loading'
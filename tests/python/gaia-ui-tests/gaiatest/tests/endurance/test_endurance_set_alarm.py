@@ -3,8 +3,6 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 # Approximate runtime per 100 iterations: 35 minutes
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 from gaiatest.apps.clock.app import Clock
 
@@ -21,7 +19,7 @@ class TestEnduranceSetAlarm(GaiaEnduranceTestCase):
         # Bug 864945, UI is not updating unless restart the app
         self.app_under_test = "clock"
         self.close_app()
-        time.sleep(2)
+        self.pause(2)
         self.clock.launch()
         self.initial_alarms_count = len(self.clock.alarms)
 
@@ -40,7 +38,7 @@ class TestEnduranceSetAlarm(GaiaEnduranceTestCase):
         # Verify the banner-countdown message appears
         alarm_msg = self.clock.banner_countdown_notification
         self.assertTrue('The alarm is set for' in alarm_msg, 'Actual banner message was: "' + alarm_msg + '"')
-        time.sleep(2)
+        self.pause(2)
 
         # Ensure all of the new alarms were added
         if self.iteration == self.iterations:
@@ -48,4 +46,4 @@ class TestEnduranceSetAlarm(GaiaEnduranceTestCase):
             self.assertEqual(len(alarms), self.initial_alarms_count + self.iteration, 'Alarms count did not increment')
 
         # A bit of sleep between reps
-        time.sleep(3)
+        self.pause(3)
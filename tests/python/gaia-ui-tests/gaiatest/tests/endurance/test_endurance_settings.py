@@ -4,8 +4,6 @@
 
 # Approximate runtime per 100 iterations: 210 minutes
 
-import time
-
 from gaiatest import GaiaEnduranceTestCase
 
 
@@ -50,7 +48,7 @@ class TestEnduranceSettings(GaiaEnduranceTestCase):
 
         # Launch settings app
         self.app = self.apps.launch("settings")
-        time.sleep(1)
+        self.pause(1)
 
         # Navigate to each screen
         for settings_area in self.settings_list:
@@ -60,7 +58,7 @@ class TestEnduranceSettings(GaiaEnduranceTestCase):
         self.close_app()
 
         # Time between reps
-        time.sleep(1)
+        self.pause(1)
 
     def verify_settings_screen_exists(self, settings_menu_locator, settings_screen_locator):
         # Navigate into the given settings screen and verify the screen is displayed
@@ -69,15 +67,15 @@ class TestEnduranceSettings(GaiaEnduranceTestCase):
 
         # Need explicit scroll because of bug 833370
         self.marionette.execute_script('arguments[0].scrollIntoView(false);', [menu_item])
-        time.sleep(1)
+        self.pause(1)
         menu_item.tap()
-        time.sleep(2)
+        self.pause(2)
         self.wait_for_element_present(settings_screen_locator[0], settings_screen_locator[1])
         self.go_back_to_main_settings()
 
     def go_back_to_main_settings(self):
         # Go back to main settings screen from a settings sub-screen
-        time.sleep(1)
+        self.pause(1)
         go_back = self.marionette.find_element(*self._back_button_locator)
         go_back.tap()
-        time.sleep(1)
+        self.pause(1)
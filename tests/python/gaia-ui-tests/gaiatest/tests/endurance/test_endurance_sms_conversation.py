@@ -40,9 +40,9 @@ class TestEnduranceSmsConversation(GaiaEnduranceTestCase):
         # temporary workaround for bug 837029: launch and then kill messages
         # app, to clear any left-over sms msg notifications
         self.app = self.apps.launch('Messages', False)
-        time.sleep(2)
+        self.pause(2)
         self.apps.kill(self.app)
-        time.sleep(2)
+        self.pause(2)
 
         # launch the app
         self.app = self.apps.launch('Messages')
@@ -77,7 +77,7 @@ class TestEnduranceSmsConversation(GaiaEnduranceTestCase):
         message_field = self.marionette.find_element(
             *self._message_field_locator)
         message_field.send_keys(_text_message_content)
-        time.sleep(1)
+        self.pause(1)
 
         # click send
         send_message_button = self.marionette.find_element(
@@ -85,7 +85,7 @@ class TestEnduranceSmsConversation(GaiaEnduranceTestCase):
         send_message_button.tap()
 
         # sleep a bit
-        time.sleep(3)
+        self.pause(3)
 
         # verify/wait for the webapi new message callback, give 5 minutes; probably
         # received the new sms message by now anyway
@@ -104,7 +104,7 @@ class TestEnduranceSmsConversation(GaiaEnduranceTestCase):
 
         # sleep with list of messages displayed; user would be here a bit to read messages
         # need sleep here anyway as with large number of messages can sometimes take awhile
-        time.sleep(15)
+        self.pause(15)
 
         # TEMP: put back in after bug 850803 is fixed
         # verify sms count in msg list has increased by 2 (one sent, one received)
@@ -118,4 +118,4 @@ class TestEnduranceSmsConversation(GaiaEnduranceTestCase):
         #self.assertEqual(_text_message_content, received_message.text)
 
         # sleep between reps
-        time.sleep(3)
+        self.pause(3)
@@ -69,4 +69,4 @@ class TestEnduranceSmsSendReceive(GaiaEnduranceTestCase):
         self.message_thread.tap_back_button()
 
         # sleep between reps
-        time.sleep(30)
+        self.pause(30)
@@ -7,8 +7,6 @@
 from gaiatest import GaiaEnduranceTestCase
 
 import datetime
-import time
-
 
 class TestEnduranceVideoPlayback(GaiaEnduranceTestCase):
 
@@ -45,7 +43,7 @@ class TestEnduranceVideoPlayback(GaiaEnduranceTestCase):
         # self.wait_for_element_displayed(*self._video_controls_locator)
 
         # Wait for video to finish
-        time.sleep(15)
+        self.pause(15)
 
         # Verify video is not playing (controls should be gone)
         self.wait_for_element_not_displayed(*self._video_controls_locator)
@@ -54,4 +52,4 @@ class TestEnduranceVideoPlayback(GaiaEnduranceTestCase):
         self.close_app()
 
         # Wait a couple of seconds before repeating
-        time.sleep(5)
+        self.pause(5)
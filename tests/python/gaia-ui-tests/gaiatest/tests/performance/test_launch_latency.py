@@ -0,0 +1,33 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from gaiatest import GaiaTestCase
+from gaiatest.launch_benchmark import LaunchBenchmark
+
+
+class TestLaunchLatency(GaiaTestCase):
+
+    def test_launch_latency(self):
+        settings = self.testvars.get('launch_benchmark', {})
+        names = settings.get('apps') or sorted(set(
+            app.name for app in self.apps.installed_apps))
+
+        benchmark = LaunchBenchmark(self.apps, self.device,
+                                    iterations=settings.get('iterations', 10),
+                                    warmup=settings.get('warmup', 1))
+        results = benchmark.run(names)
+        capabilities = self.marionette.session_capabilities
+        benchmark.write(settings.get('output', 'launch_latency.json'), results, {
+            'device': capabilities.get('device'),
+            'version': capabilities.get('version'),
+            'buildid': capabilities.get('appBuildId')})
+
+        for name in sorted(results):
+            if 'error' not in results[name]:
+                print '%s: cold open %sms, load %sms, warm open %sms (median)' % (
+                    name, results[name]['cold']['open']['median'],
+                    results[name]['cold']['load']['median'],
+                    results[name]['warm']['open']['median'])
+        failed = [name for name in results if 'error' in results[name]]
+        self.assertFalse(failed, 'Failed to measure: %s' % ', '.join(failed))
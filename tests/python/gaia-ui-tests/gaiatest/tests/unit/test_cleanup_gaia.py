@@ -51,6 +51,31 @@ class TestCleanupGaia(GaiaTestCase):
         self.cleanup_gaia()
         self.check_initial_state()
 
+    def test_cleanup_gaia_diff(self):
+        # the baseline is shared with the tests that follow in the session
+        baseline = GaiaTestCase._cleanup_baseline
+        try:
+            GaiaTestCase._cleanup_baseline = self.snapshot_state()
+            self.check_initial_state()
+
+            # change volume
+            self.data_layer.set_volume(5)
+
+            # insert contacts
+            self.data_layer.insert_contact(MockContact())
+            self.assertEqual(len(self.data_layer.all_contacts), 1)
+
+            # add files, one with a name that needs quoting
+            self.device.file_manager.push_file(self.resource('IMG_0001.jpg'))
+            path = '/'.join([self.device.storage_path, 'IMG_0001.jpg'])
+            self.device.file_manager.copy_file(path, '%s copy.jpg' % path[:-len('.jpg')])
+
+            self.cleanup_gaia_diff()
+            self.check_initial_state()
+            self.assertEqual(self.snapshot_state(), GaiaTestCase._cleanup_baseline)
+        finally:
+            GaiaTestCase._cleanup_baseline = baseline
+
     def check_initial_state(self):
         self.assertFalse(self.device.is_locked)
 
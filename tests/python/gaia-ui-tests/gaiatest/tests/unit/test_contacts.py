@@ -23,5 +23,7 @@ class TestContacts(GaiaTestCase):
     def test_and_remove_contact(self):
         self.data_layer.insert_contact(MockContact())
         self.assertEqual(len(self.data_layer.all_contacts), 1)
+        self.assertEqual(self.data_layer.contact_count, 1)
         self.data_layer.remove_all_contacts()
         self.assertEqual(self.data_layer.all_contacts, [])
+        self.assertEqual(self.data_layer.contact_count, 0)
@@ -0,0 +1,54 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import os
+import shutil
+import tempfile
+
+from gaiatest import GaiaTestCase
+from gaiatest.duration_store import DurationStore
+from gaiatest.mixins.durations import DurationsTestRunnerMixin
+
+
+class Scheduler(DurationsTestRunnerMixin):
+
+    def __init__(self, test_durations):
+        self.test_durations = test_durations
+
+
+class TestDurations(GaiaTestCase):
+
+    def setUp(self):
+        GaiaTestCase.setUp(self)
+        self.store_dir = tempfile.mkdtemp()
+
+    def test_duration_store(self):
+        store = DurationStore(os.path.join(self.store_dir, 'durations.sqlite'))
+        for total in [10, 30, 20]:
+            store.record([{'test_id': 'test_a.TestA.test_a', 'filename': 'test_a.py',
+                           'result': 'PASS', 'total': total},
+                          {'test_id': 'test_a.TestA.test_b', 'filename': 'test_a.py',
+                           'result': 'PASS', 'total': 1}], 'flame')
+        store.record([{'test_id': 'test_c.TestC.test_c', 'filename': 'test_c.py',
+                       'result': 'PASS', 'total': 5}], 'qemu')
+        self.assertEqual(store.file_durations('flame'), {'test_a.py': 21})
+        self.assertEqual(store.slowest('flame')[0]['test_id'], 'test_a.TestA.test_a')
+        store.close()
+
+    def test_balance_chunks(self):
+        tests = [{'filepath': '/tests/test_%s.py' % name} for name in 'abcdefgh']
+        scheduler = Scheduler({'test_a.py': 30, 'test_b.py': 10})
+
+        chunks = scheduler.balance_chunks(tests, 3)
+        # unknown tests take the average of the known ones, 20 seconds
+        self.assertEqual(chunks[0][0], tests[0])
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 3, 3])
+
+        # with nothing known, tests are spread evenly
+        chunks = Scheduler({}).balance_chunks(tests[2:], 3)
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 2])
+
+    def tearDown(self):
+        shutil.rmtree(self.store_dir)
+        GaiaTestCase.tearDown(self)
@@ -0,0 +1,63 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import os
+import shutil
+import tempfile
+
+from gaiatest import GaiaTestCase
+from gaiatest.endurance_results import EnduranceRun, find_runs, load_averages
+
+
+class TestEnduranceResults(GaiaTestCase):
+
+    def setUp(self):
+        GaiaTestCase.setUp(self)
+        self.results_dir = tempfile.mkdtemp()
+
+    def test_results_file(self):
+        run = EnduranceRun('test_endurance_clock', 'clock', 4, 2, device={'os': '2.0'})
+        run.iteration_durations = [1.5, 1.25, 1.0, 1.75]
+        run.add_checkpoint(2, 1000, {'app://clock.gaiamobile.org': 100})
+        run.add_checkpoint(4, 1200, {'app://clock.gaiamobile.org': 300})
+        path = os.path.join(self.results_dir, 'checkpoint_test_results.jsonl')
+        run.write(path)
+
+        read = EnduranceRun.read(path)
+        self.assertEqual(read.b2g_rss, [1000, 1200])
+        self.assertEqual(read.rss_by_app, {'app://clock.gaiamobile.org': [100, 300]})
+        self.assertEqual(read.iteration_durations, run.iteration_durations)
+        self.assertEqual(read.device, {'os': '2.0'})
+        self.assertEqual(find_runs(self.results_dir), [path])
+        self.assertEqual(load_averages(self.results_dir), {
+            'test_endurance_clock': 1100,
+            'test_endurance_clock[app://clock.gaiamobile.org]': 200})
+
+    def test_iteration_summary(self):
+        run = EnduranceRun('test_endurance_clock')
+        run.iteration_durations = [1.0 + i * .5 for i in range(40)]
+        summary = run.iteration_summary()
+        self.assertEqual(summary['compared'], 10)
+        self.assertEqual(summary['first_median'], 3.25)
+        self.assertEqual(summary['last_median'], 18.25)
+        self.assertAlmostEqual(summary['slope'], .5)
+        self.assertEqual(summary['p95'], 19.5)
+
+    def test_summary_logs(self):
+        path = os.path.join(self.results_dir, 'checkpoint_test_summary.log')
+        with open(path, 'w') as f:
+            f.write('test_name: test_endurance_clock\ncompleted: 20140101120000\n'
+                    'app_under_test: clock\ntotal_iterations: 4\ncheckpoint_interval: 2\n'
+                    'b2g_rss: 1000, 1200\navg_rss: 1100\n\n')
+        with open(os.path.join(self.results_dir, 'avg_b2g_rss_suite_summary.log'), 'w') as f:
+            f.write('test_endurance_clock: 1100\n')
+
+        run = EnduranceRun.read(find_runs(self.results_dir)[0])
+        self.assertEqual(run.b2g_rss, [1000, 1200])
+        self.assertEqual([c['iteration'] for c in run.checkpoints], [2, 4])
+        self.assertEqual(load_averages(self.results_dir), {'test_endurance_clock': 1100})
+
+    def tearDown(self):
+        shutil.rmtree(self.results_dir)
+        GaiaTestCase.tearDown(self)
@@ -0,0 +1,20 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from gaiatest import GaiaTestCase
+
+
+class TestMeasureLaunch(GaiaTestCase):
+
+    def test_measure_launch(self):
+        cold = self.apps.measure_launch('Clock')
+        self.assertTrue(cold['cold'])
+        self.assertGreater(cold['load'], 0)
+        self.assertGreater(cold['open'], 0)
+
+        self.device.touch_home_button()
+        warm = self.apps.measure_launch('Clock')
+        self.assertFalse(warm['cold'])
+        self.assertIsNone(warm['load'])
+        self.assertGreater(warm['open'], 0)
@@ -0,0 +1,80 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import requests
+
+from gaiatest import GaiaTestCase
+from gaiatest.outbox import Outbox
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        # reject every first attempt, as a service that is down would
+        if self.server.attempts.setdefault(body, 0) == 0:
+            self.send_response(503)
+        else:
+            self.server.received.append(json.loads(body))
+            self.send_response(200)
+        self.server.attempts[body] += 1
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOutbox(GaiaTestCase):
+
+    def setUp(self):
+        GaiaTestCase.setUp(self)
+        self.server = HTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.attempts = {}
+        self.server.received = []
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.outbox_dir = tempfile.mkdtemp()
+
+    def send(self, destination, payload):
+        requests.post(destination['url'], data=json.dumps(payload)).raise_for_status()
+
+    def test_outbox(self):
+        path = os.path.join(self.outbox_dir, 'outbox.sqlite')
+        destination = {'url': 'http://127.0.0.1:%d/' % self.server.server_port}
+        outbox = Outbox(path, initial_delay=0)
+        for i in range(5):
+            outbox.put('stub', destination, {'run': i})
+        outbox.close()
+
+        outbox = Outbox(path, initial_delay=0)
+        self.assertEqual(outbox.flush({'stub': self.send}, batch_size=2), (0, 5))
+        self.assertEqual(outbox.pending(), 5)
+        self.assertEqual(outbox.flush({'stub': self.send}, batch_size=2), (5, 0))
+        self.assertEqual(outbox.pending(), 0)
+        self.assertEqual(sorted(r['run'] for r in self.server.received), range(5))
+        outbox.close()
+
+    def test_backoff(self):
+        outbox = Outbox(os.path.join(self.outbox_dir, 'outbox.sqlite'),
+                        initial_delay=60, maximum_delay=600)
+        self.assertEqual([outbox.delay(a) for a in range(1, 6)], [60, 120, 240, 480, 600])
+        outbox.put('stub', {'url': 'http://127.0.0.1:%d/' % self.server.server_port}, {})
+        self.assertEqual(outbox.flush({'stub': self.send}), (0, 1))
+        # not due again until the delay has passed
+        self.assertEqual(outbox.flush({'stub': self.send}), (0, 0))
+        self.assertEqual(outbox.pending(), 1)
+        outbox.close()
+
+    def tearDown(self):
+        self.server.shutdown()
+        shutil.rmtree(self.outbox_dir)
+        GaiaTestCase.tearDown(self)
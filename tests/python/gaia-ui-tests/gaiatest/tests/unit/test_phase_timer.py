@@ -0,0 +1,16 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from gaiatest import GaiaTestCase
+
+
+class TestPhaseTimer(GaiaTestCase):
+
+    def test_phase_timer(self):
+        for path in ['setUp', 'setUp/MarionetteTestCase.setUp',
+                     'setUp/FakeUpdateChecker', 'setUp/timeouts']:
+            self.assertIn(path, self.timer.durations)
+
+        self.data_layer.get_setting('time.timezone')
+        self.assertEqual(self.timer.counts['test/GaiaData.get_setting'], 1)
@@ -19,3 +19,12 @@ class TestPrefs(GaiaTestCase):
         self.data_layer.set_bool_pref('gaiauitest.pref.enabled', True)
         test_pref = self.data_layer.get_bool_pref('gaiauitest.pref.enabled')
         self.assertEquals(test_pref, True)
+
+    def test_set_multiple_prefs(self):
+        self.assertEqual(self.data_layer.set_prefs({
+            'gaiauitest.pref.int_value': 19,
+            'gaiauitest.pref.enabled': True,
+            'gaiauitest.pref.char_value': 'char'}), {})
+        self.assertEquals(self.data_layer.get_int_pref('gaiauitest.pref.int_value'), 19)
+        self.assertEquals(self.data_layer.get_bool_pref('gaiauitest.pref.enabled'), True)
+        self.assertEquals(self.data_layer.get_char_pref('gaiauitest.pref.char_value'), 'char')
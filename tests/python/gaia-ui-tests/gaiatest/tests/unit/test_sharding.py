@@ -0,0 +1,77 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import os
+
+from gaiatest import GaiaTestCase
+from gaiatest.mixins.sharding import ShardingTestRunnerMixin
+
+
+class Logger(object):
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class ShardedRunner(ShardingTestRunnerMixin):
+    """Runs sharded tests without targets. The first worker passes every
+    test it takes and the second exits without reporting its results."""
+
+    shard_poll_interval = 1
+
+    def __init__(self, repeat=0):
+        self.address = 'localhost:2828'
+        self.logger = Logger()
+        self.repeat = repeat
+        self.shuffle = False
+        self.xml_output = None
+        self.mixin_run_tests = []
+        self.tests = []
+        self.manifest_skipped_tests = []
+        self.added = 0
+        ShardingTestRunnerMixin.__init__(self, devices='first,second')
+
+    def reset_test_stats(self):
+        self.passed = self.failed = self.unexpected_successes = self.todo = self.skipped = 0
+        self.results = []
+        self.failures = []
+
+    def add_test(self, test):
+        self.added += 1
+        self.tests.append({'filepath': test, 'expected': 'pass', 'oop': False})
+
+    def load_durations(self):
+        pass
+
+    def run_test_sets(self):
+        self.queue_test_set(list(self.tests))
+
+    def run_shard(self, index, tasks, messages):
+        messages.put(('ready', index, {'device': 'qemu'}))
+        if index == 1:
+            os._exit(1)
+        ran = []
+        while True:
+            test = tasks.get()
+            if test is None:
+                break
+            ran.append(test['filepath'])
+        messages.put(('done', index, {'target': self.shard_name(index), 'results': [],
+                                      'failures': [], 'passed': len(ran), 'failed': 0,
+                                      'unexpected_successes': 0, 'todo': 0, 'skipped': 0}))
+
+
+class TestSharding(GaiaTestCase):
+
+    def test_dead_shard_is_reported(self):
+        runner = ShardedRunner(repeat=1)
+        tests = ['test_%s.py' % name for name in 'abcd']
+        runner.run_sharded_tests(tests)
+
+        # the tests are resolved once, and every repeat runs on the live shard
+        self.assertEqual(runner.added, len(tests))
+        self.assertEqual(runner.passed, 2 * len(tests))
+        self.assertEqual(runner.failed, 1)
+        self.assertEqual(runner.failures[0][0], 'second')
+        self.assertIn('exited with code 1', runner.failures[0][1])
@@ -0,0 +1,103 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import os
+import sys
+import time
+import unittest
+
+import marionette
+
+
+class WireProfiler(object):
+    """Counts and times every command a Marionette client sends, by call site.
+
+    Each command is recorded under the Python frames that led to it, from the
+    test or setUp method down to the innermost page object method, so the
+    profile can be written out in the collapsed stack format read by flame
+    graph tools.
+    """
+
+    # frames from the client, the runner and unittest are not part of a call site
+    _ignored_dirs = tuple(os.path.dirname(os.path.abspath(module.__file__)) + os.sep
+                          for module in (marionette, unittest))
+
+    def __init__(self, marionette):
+        self.marionette = marionette
+        # {(frame, ..., command): [count, seconds]}
+        self.stacks = {}
+        self._send = None
+
+    def start(self):
+        # profile the transport, so only commands that reach the server count
+        self._send = self.marionette.client.send
+        self.marionette.client.send = self._profiled_send
+
+    def stop(self):
+        if self._send:
+            del self.marionette.client.send
+            self._send = None
+
+    def _profiled_send(self, message):
+        stack = self._call_site(sys._getframe(1)) + (message.get('name'),)
+        start = time.time()
+        try:
+            return self._send(message)
+        finally:
+            entry = self.stacks.setdefault(stack, [0, 0])
+            entry[0] += 1
+            entry[1] += time.time() - start
+
+    def _call_site(self, frame):
+        frames = []
+        # walk out to the test case method, skipping the frames of the client
+        # and its helpers, such as Wait, of lambdas and of wrappers that hide
+        # themselves from tracebacks, and stop where the runner or unittest
+        # calls into the test case
+        while frame:
+            if not self._is_ignored(frame):
+                if not (frame.f_code.co_name.startswith('<') or
+                        frame.f_locals.get('__tracebackhide__')):
+                    frames.append(self._frame_name(frame))
+            elif frames and isinstance(frame.f_locals.get('self'), unittest.TestCase):
+                break
+            frame = frame.f_back
+        return tuple(reversed(frames))
+
+    def _is_ignored(self, frame):
+        return os.path.abspath(frame.f_code.co_filename).startswith(self._ignored_dirs)
+
+    def _frame_name(self, frame):
+        instance = frame.f_locals.get('self')
+        if instance is not None:
+            return '%s.%s' % (type(instance).__name__, frame.f_code.co_name)
+        return '%s.%s' % (frame.f_globals.get('__name__'), frame.f_code.co_name)
+
+    def write_collapsed(self, path):
+        """Write the profile as collapsed stacks, weighted in microseconds."""
+        with open(path, 'w') as f:
+            for stack, (count, seconds) in sorted(self.stacks.items()):
+                f.write('%s %d\n' % (';'.join(stack), seconds * 1000000))
+
+    def top(self, limit=10):
+        """Returns the (count, seconds, caller, command) of the call sites
+        that spent longest on Marionette commands, longest first.
+
+        The caller is the innermost frame the command was sent from.
+        """
+        sites = {}
+        for stack, (count, seconds) in self.stacks.items():
+            key = (stack[-2] if len(stack) > 1 else None, stack[-1])
+            site = sites.setdefault(key, [0, 0])
+            site[0] += count
+            site[1] += seconds
+        rows = [(count, seconds, caller, command)
+                for (caller, command), (count, seconds) in sites.items()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)[:limit]
+
+    def report(self, limit=10):
+        lines = ['%6s %9s  %s' % ('calls', 'seconds', 'caller: command')]
+        for count, seconds, caller, command in self.top(limit):
+            lines.append('%6d %9.3f  %s: %s' % (count, seconds, caller, command))
+        return '\n'.join(lines)
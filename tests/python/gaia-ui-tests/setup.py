@@ -53,5 +53,8 @@ setup(name='gaiatest',
       zip_safe=False,
       entry_points={'console_scripts': [
           'gaiatest = gaiatest.runtests:main',
+          'gaiatest-durations = gaiatest.duration_store:cli',
+          'gaiatest-flush = gaiatest.outbox:cli',
+          'gaiatest-sleeps = gaiatest.sleep_report:cli',
           'gcli = gaiatest.gcli:cli']},
       install_requires=deps)